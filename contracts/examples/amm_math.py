@@ -0,0 +1,160 @@
+"""
+AMM Math
+========
+Constant product (x * y = k) pricing shared by the Aether AI DEX examples.
+Both the "/openDEX" router and the "/connectTinyman" connector quote through
+these helpers so their numbers never diverge.
+
+Features:
+- Swap output with fee and price impact in one call
+- Plain tuples on the hot path (no per-quote dict allocation)
+- Exact integer (micro-unit, basis point) math mirrored by PyTeal expressions
+- Impermanent loss and fee break-even in closed form (scalars or NumPy arrays)
+"""
+
+BPS_DENOMINATOR = 10000
+UINT64_MAX = 2 ** 64 - 1
+MICRO_UNITS = 10 ** 6           # ALGO and the demo ASAs all use 6 decimals
+DEFAULT_FEE_BPS = 25            # 0.25%
+DEFAULT_SLIPPAGE_BPS = 100      # 1%
+
+
+def constant_product_output(input_amount, input_reserve, output_reserve, fee):
+    """
+    Quote a swap against a constant product pool.
+
+    The fee is taken from the output side, matching the Tinyman connector's
+    model. Returns (output_after_fees, fee_amount, price_impact) where
+    price_impact is the percentage shortfall of the execution price versus
+    the pool's spot price before fees.
+    """
+    # AMM formula: output = (input * output_reserve) / (input_reserve + input)
+    raw_output = (input_amount * output_reserve) / (input_reserve + input_amount)
+    fee_amount = raw_output * fee
+    price_impact = (input_amount / (input_reserve + input_amount)) * 100
+    return raw_output - fee_amount, fee_amount, price_impact
+
+
+def spot_rate(input_reserve, output_reserve, fee):
+    """Marginal output per unit of input for an infinitesimal swap"""
+    return (output_reserve / input_reserve) * (1 - fee)
+
+
+def curve_coefficients(input_reserve, output_reserve, fee):
+    """
+    Express a pool as output = alpha * x / (beta + x).
+
+    Constant product swaps (and chains of them) all share this shape, which
+    lets routing and order splitting work on two numbers per leg.
+    """
+    return (1 - fee) * output_reserve, input_reserve
+
+
+def compose_curves(curves):
+    """Fold a chain of (alpha, beta) swap curves into a single curve"""
+    alpha, beta = curves[0]
+    for next_alpha, next_beta in curves[1:]:
+        scale = next_beta + alpha
+        alpha, beta = alpha * next_alpha / scale, beta * next_beta / scale
+    return alpha, beta
+
+
+def curve_output(curve, input_amount):
+    """Output of an (alpha, beta) swap curve for a given input"""
+    alpha, beta = curve
+    return alpha * input_amount / (beta + input_amount)
+
+
+def impermanent_loss(price_ratio):
+    """
+    Loss of a 50/50 constant product position versus holding, as a fraction.
+
+    price_ratio is the current over initial price of one asset in the other;
+    the LP position is worth 2 * sqrt(r) / (1 + r) of the held assets.
+    Works elementwise on NumPy arrays.
+    """
+    return 1 - 2 * price_ratio ** 0.5 / (1 + price_ratio)
+
+
+def break_even_fee_return(price_ratio):
+    """Fee return on the LP position needed to match holding after a price move"""
+    return (1 + price_ratio) / (2 * price_ratio ** 0.5) - 1
+
+
+def to_micro(amount):
+    """Convert a whole-unit amount to integer micro-units"""
+    return int(round(amount * MICRO_UNITS))
+
+
+def fee_to_bps(fee):
+    """Convert a fractional fee (0.0025) to basis points (25)"""
+    return int(round(fee * BPS_DENOMINATOR))
+
+
+def _wide_ratio(a, b, c):
+    """floor(a * b / c) with a 128-bit intermediate, failing like the AVM's WideRatio"""
+    result = (a * b) // c
+    if result > UINT64_MAX:
+        raise OverflowError("WideRatio result exceeds uint64")
+    return result
+
+
+def swap_output_micro(input_amount, input_reserve, output_reserve, fee_bps=DEFAULT_FEE_BPS):
+    """
+    Integer constant product quote in micro-units.
+
+    Bit-for-bit identical to teal_swap_output: both round down at the same
+    two steps, so an off-chain quote is exactly what the contract computes.
+    """
+    denominator = input_reserve + input_amount
+    if denominator > UINT64_MAX:
+        raise OverflowError("Reserve plus input exceeds uint64")
+    raw_output = _wide_ratio(input_amount, output_reserve, denominator)
+    return _wide_ratio(raw_output, BPS_DENOMINATOR - fee_bps, BPS_DENOMINATOR)
+
+
+def min_output_micro(expected_output, slippage_bps=DEFAULT_SLIPPAGE_BPS):
+    """Minimum acceptable output after slippage, rounded down like teal_min_output"""
+    return _wide_ratio(expected_output, BPS_DENOMINATOR - slippage_bps, BPS_DENOMINATOR)
+
+
+def _teal_int(value):
+    """Lift Python ints to PyTeal Int expressions, leaving expressions untouched"""
+    from pyteal import Int
+    return Int(value) if isinstance(value, int) else value
+
+
+def _teal_bps_complement(bps):
+    """BPS_DENOMINATOR - bps, folded to a constant when bps is known at compile time"""
+    from pyteal import Int, Minus
+    if isinstance(bps, int):
+        return Int(BPS_DENOMINATOR - bps)
+    return Minus(Int(BPS_DENOMINATOR), bps)
+
+
+def teal_mul_div(a, b, c):
+    """
+    PyTeal floor(a * b / c) with a 128-bit intermediate.
+
+    Same result and failure modes as WideRatio([a, b], [c]), but compiled to
+    mulw + divw instead of divmodw, which costs 20 opcodes on its own.
+    """
+    from pyteal import Divw, MultiValue, Op, TealType
+
+    product = MultiValue(Op.mulw, [TealType.uint64, TealType.uint64], args=[_teal_int(a), _teal_int(b)])
+    return product.outputReducer(lambda high, low: Divw(high, low, _teal_int(c)))
+
+
+def teal_swap_output(input_amount, input_reserve, output_reserve, fee_bps=DEFAULT_FEE_BPS):
+    """PyTeal expression computing swap_output_micro on-chain"""
+    # Imported here so off-chain callers don't need PyTeal installed
+    from pyteal import Add
+
+    input_amount = _teal_int(input_amount)
+    raw_output = teal_mul_div(input_amount, output_reserve, Add(_teal_int(input_reserve), input_amount))
+    return teal_mul_div(raw_output, _teal_bps_complement(fee_bps), BPS_DENOMINATOR)
+
+
+def teal_min_output(expected_output, slippage_bps=DEFAULT_SLIPPAGE_BPS):
+    """PyTeal expression computing min_output_micro on-chain"""
+    return teal_mul_div(expected_output, _teal_bps_complement(slippage_bps), BPS_DENOMINATOR)
@@ -0,0 +1,133 @@
+"""
+Arbitrage Detector
+==================
+Negative-cycle detection over a TokenGraph of constant product pools.
+Powers the Aether AI "/openDEX" arbitrage operation and the Tinyman
+"arbitrage_hunting" strategy.
+
+Features:
+- Bounded-length cycle index built once per graph topology
+- Fee-adjusted -log(rate) weights: a negative cycle is a profitable loop
+- Incremental re-evaluation of only the cycles through an updated pool
+- Closed-form optimal trade size per cycle
+"""
+
+import math
+from collections import defaultdict
+
+from amm_math import compose_curves, curve_coefficients, curve_output
+
+
+class ArbitrageDetector:
+    """Tracks profitable swap cycles as pool reserves change"""
+
+    def __init__(self, token_graph, max_length=3, min_profit=0.0):
+        self.token_graph = token_graph
+        self.max_length = max_length
+        # Cycles must beat this rate of return after fees to be reported
+        self.min_profit = min_profit
+        self.rebuild()
+
+    def rebuild(self):
+        """Re-enumerate cycles after pools are added to the graph"""
+        self.cycles = []                        # cycle id -> tuple of PoolEdge
+        self.cycle_weights = []                 # cycle id -> sum of -log(rate)
+        self.pool_cycles = defaultdict(list)    # (venue, pool_key) -> [cycle id]
+        self.profitable = set()
+
+        for cycle in self._enumerate_cycles():
+            cycle_id = len(self.cycles)
+            self.cycles.append(cycle)
+            self.cycle_weights.append(0.0)
+            for pool in {(edge.venue, edge.pool_key) for edge in cycle}:
+                self.pool_cycles[pool].append(cycle_id)
+            self._evaluate(cycle_id)
+
+    def _enumerate_cycles(self):
+        """Yield each simple cycle of up to max_length pools exactly once"""
+        adjacency = self.token_graph.adjacency
+        pair_edges = self.token_graph.pair_edges
+        predecessors = self.token_graph.predecessors
+        rank = {token: i for i, token in enumerate(sorted(adjacency))}
+
+        # Only walk through tokens ranked above the start so rotations are skipped
+        def walk(start, node, path, seen):
+            if path:
+                # Close the loop from the pair index rather than scanning a hub's whole adjacency
+                last_pool = (path[-1].venue, path[-1].pool_key)
+                for edge in pair_edges.get((node, start), ()):
+                    # Trading straight back through the same pool can never be profitable
+                    if (edge.venue, edge.pool_key) != last_pool:
+                        yield tuple(path) + (edge,)
+            if len(path) + 1 >= self.max_length:
+                return
+            edges = adjacency.get(node, ())
+            if len(path) + 2 == self.max_length:
+                # The next token must close the loop, so only tokens trading back into start qualify
+                closers = predecessors.get(start, ())
+                if len(closers) < len(edges):
+                    edges = [
+                        edge
+                        for token in sorted(closers, key=rank.__getitem__)
+                        for edge in pair_edges.get((node, token), ())
+                    ]
+                else:
+                    edges = [edge for edge in edges if edge.token_out in closers]
+            for edge in edges:
+                nxt = edge.token_out
+                if rank[nxt] > rank[start] and nxt not in seen:
+                    seen.add(nxt)
+                    path.append(edge)
+                    yield from walk(start, nxt, path, seen)
+                    path.pop()
+                    seen.discard(nxt)
+
+        for start in adjacency:
+            yield from walk(start, start, [], {start})
+
+    def _evaluate(self, cycle_id):
+        """Recompute one cycle's weight and its profitable flag"""
+        weight = sum(edge.weight for edge in self.cycles[cycle_id])
+        self.cycle_weights[cycle_id] = weight
+        if weight < -math.log1p(self.min_profit):
+            self.profitable.add(cycle_id)
+        else:
+            self.profitable.discard(cycle_id)
+
+    def update_pool(self, venue, pool_key):
+        """Re-check only the cycles that trade through a repriced pool"""
+        for cycle_id in self.pool_cycles.get((venue, pool_key), ()):
+            self._evaluate(cycle_id)
+        return len(self.profitable)
+
+    def opportunities(self, limit=None):
+        """Profitable cycles, best rate of return first"""
+        ranked = sorted(self.profitable, key=self.cycle_weights.__getitem__)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self._describe(cycle_id) for cycle_id in ranked]
+
+    def _describe(self, cycle_id):
+        """Summarise a cycle with its optimal trade size"""
+        cycle = self.cycles[cycle_id]
+        rate = math.exp(-self.cycle_weights[cycle_id])
+
+        max_size = expected_profit = None
+        if all(edge.reserve_in for edge in cycle):
+            # Fold the loop into one curve: profit peaks where marginal rate hits 1
+            alpha, beta = compose_curves([
+                curve_coefficients(edge.reserve_in, edge.reserve_out, edge.fee) for edge in cycle
+            ])
+            max_size = max(math.sqrt(alpha * beta) - beta, 0.0)
+            expected_profit = curve_output((alpha, beta), max_size) - max_size
+
+        return {
+            'cycle': [cycle[0].token_in] + [edge.token_out for edge in cycle],
+            'hops': [
+                {'dex': edge.venue, 'pool': edge.pool_key, 'token_in': edge.token_in, 'token_out': edge.token_out}
+                for edge in cycle
+            ],
+            'rate_of_return': rate - 1,
+            'max_size': max_size,
+            'expected_profit': expected_profit
+        }
@@ -0,0 +1,567 @@
+"""
+AVM Simulator
+=============
+Offline evaluator for the compiled Aether AI contracts. Runs approval
+programs against an in-memory ledger so contract changes can be benchmarked
+in CI without an Algorand node.
+
+Features:
+- Interpreter for the TEAL v8 subset PyTeal emits for these contracts
+  (stack, scratch, branches, subroutines, wide math, app state, logs)
+- In-memory ledger with global state, per-account local state and a clock
+- Per-call opcode cost against the (optionally pooled) application budget
+- Failed calls roll back their state changes, like a rejected transaction
+- Synthetic swap / balance-update workloads reporting cost and state growth
+
+Usage:
+    python avm_sim.py                              # both contracts, default workload
+    python avm_sim.py swap_algo --calls 20000 --accounts 500
+    python avm_sim.py --json
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+from teal_profile import APP_CALL_BUDGET, OPCODE_COSTS, parse_teal
+
+UINT64_MAX = 2 ** 64 - 1
+
+ON_COMPLETION = {
+    'NoOp': 0, 'OptIn': 1, 'CloseOut': 2, 'ClearState': 3, 'UpdateApplication': 4, 'DeleteApplication': 5
+}
+TXN_TYPES = {'unknown': 0, 'pay': 1, 'keyreg': 2, 'acfg': 3, 'axfer': 4, 'afrz': 5, 'appl': 6}
+NAMED_INTS = dict(ON_COMPLETION, **TXN_TYPES)
+
+
+class AVMError(Exception):
+    """Program failure (err, failed assert, panic or exhausted budget)"""
+
+    def __init__(self, message, line=None):
+        super().__init__(message if line is None else f"line {line}: {message}")
+        self.line = line
+
+
+def itob(value):
+    """uint64 -> 8 big-endian bytes, as the AVM's itob"""
+    return value.to_bytes(8, 'big')
+
+
+def address(seed):
+    """Deterministic 32-byte account address for simulations"""
+    return hashlib.sha256(str(seed).encode()).digest()
+
+
+class Transaction:
+    """Application call fields visible to the program"""
+
+    __slots__ = ('sender', 'app_args', 'on_completion', 'application_id', 'group_size')
+
+    def __init__(self, sender, app_args=(), on_completion='NoOp', application_id=None, group_size=1):
+        self.sender = sender
+        self.app_args = [arg if isinstance(arg, bytes) else itob(arg) for arg in app_args]
+        self.on_completion = on_completion
+        self.application_id = application_id    # None: the ledger's app id; 0: creation
+        self.group_size = group_size
+
+
+class Ledger:
+    """In-memory stand-in for the state of one application"""
+
+    def __init__(self, app_id=1, timestamp=1700000000):
+        self.app_id = app_id
+        self.timestamp = timestamp
+        self.round = 1
+        self.global_state = {}
+        self.local_state = {}       # address -> {key: value}
+
+    def advance(self, seconds=4):
+        """Move the clock forward by one block"""
+        self.timestamp += seconds
+        self.round += 1
+
+    def storage_report(self):
+        """State entry counts and key+value bytes (uint64 values count as 8 bytes)"""
+        def size(state):
+            return sum(len(key) + (8 if isinstance(value, int) else len(value)) for key, value in state.items())
+
+        return {
+            'global_keys': len(self.global_state),
+            'global_bytes': size(self.global_state),
+            'opted_in_accounts': len(self.local_state),
+            'local_keys': sum(len(state) for state in self.local_state.values()),
+            'local_bytes': sum(size(state) for state in self.local_state.values())
+        }
+
+
+class CallResult:
+    """Outcome of evaluating one application call"""
+
+    __slots__ = ('approved', 'cost', 'logs', 'error')
+
+    def __init__(self, approved, cost, logs, error=None):
+        self.approved = approved
+        self.cost = cost
+        self.logs = logs
+        self.error = error
+
+
+class Program:
+    """Compiled TEAL decoded once into (op, immediate, cost, line) tuples"""
+
+    def __init__(self, text):
+        instructions, labels = parse_teal(text)
+        self.code = []
+        for instruction in instructions:
+            op, args = instruction.op, instruction.args
+            if op in ('b', 'bz', 'bnz', 'callsub'):
+                immediate = labels[args[0]]
+            elif op == 'int':
+                immediate = NAMED_INTS[args[0]] if args[0] in NAMED_INTS else int(args[0], 0)
+            elif op == 'byte':
+                immediate = self._decode_bytes(args)
+            elif op in ('store', 'load'):
+                immediate = int(args[0])
+            elif op == 'txna':
+                immediate = (args[0], int(args[1]))
+            else:
+                immediate = args[0] if args else None
+            self.code.append((op, immediate, OPCODE_COSTS.get(op, 1), instruction.line))
+
+    @staticmethod
+    def _decode_bytes(args):
+        if args[0].startswith('"'):
+            return ast.literal_eval('b' + args[0])
+        if args[0].startswith('0x'):
+            return bytes.fromhex(args[0][2:])
+        raise ValueError(f"Unsupported byte constant: {' '.join(args)}")
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(f.read())
+
+
+def _uint(value, line):
+    if not isinstance(value, int):
+        raise AVMError("expected uint64, got bytes", line)
+    return value
+
+
+def _bytes(value, line):
+    if not isinstance(value, bytes):
+        raise AVMError("expected bytes, got uint64", line)
+    return value
+
+
+def evaluate(program, ledger, txn, budget=APP_CALL_BUDGET):
+    """
+    Run one application call and return a CallResult.
+
+    State writes go to copies that are committed only when the program
+    approves, so a rejected or failed call leaves the ledger untouched.
+    """
+    app_id = ledger.app_id if txn.application_id is None else txn.application_id
+    global_state = dict(ledger.global_state)
+    local_state = {}            # address -> copied local state touched by this call
+    if txn.on_completion == 'OptIn':
+        # Opt-in takes effect before the approval program runs
+        local_state[txn.sender] = dict(ledger.local_state.get(txn.sender, {}))
+
+    def local_for(account, line):
+        if isinstance(account, int):
+            if account != 0:
+                raise AVMError("only the sender (account 0) is available", line)
+            account = txn.sender
+        if account not in local_state:
+            if account not in ledger.local_state:
+                raise AVMError("account is not opted in", line)
+            local_state[account] = dict(ledger.local_state[account])
+        return local_state[account]
+
+    def is_opted_in(account):
+        account = txn.sender if account == 0 else account
+        return account in local_state or account in ledger.local_state
+
+    code = program.code
+    stack, scratch, frames, logs = [], {}, [], []
+    cost, pc = 0, 0
+    push, pop = stack.append, stack.pop
+    approved = None
+
+    try:
+        while pc < len(code):
+            op, immediate, op_cost, line = code[pc]
+            cost += op_cost
+            if cost > budget:
+                raise AVMError(f"dynamic cost budget exceeded ({budget})", line)
+            pc += 1
+
+            if op == 'int' or op == 'byte':
+                push(immediate)
+            elif op == 'load':
+                push(scratch.get(immediate, 0))
+            elif op == 'store':
+                scratch[immediate] = pop()
+            elif op == 'txn':
+                if immediate == 'Sender':
+                    push(txn.sender)
+                elif immediate == 'ApplicationID':
+                    push(app_id)
+                elif immediate == 'OnCompletion':
+                    push(ON_COMPLETION[txn.on_completion])
+                elif immediate == 'NumAppArgs':
+                    push(len(txn.app_args))
+                elif immediate == 'TypeEnum':
+                    push(TXN_TYPES['appl'])
+                else:
+                    raise AVMError(f"unsupported txn field {immediate}", line)
+            elif op == 'txna':
+                field, index = immediate
+                if field != 'ApplicationArgs':
+                    raise AVMError(f"unsupported txna field {field}", line)
+                if index >= len(txn.app_args):
+                    raise AVMError(f"application argument {index} out of range", line)
+                push(txn.app_args[index])
+            elif op == 'global':
+                if immediate == 'LatestTimestamp':
+                    push(ledger.timestamp)
+                elif immediate == 'Round':
+                    push(ledger.round)
+                elif immediate == 'GroupSize':
+                    push(txn.group_size)
+                elif immediate == 'CurrentApplicationID':
+                    push(app_id)
+                else:
+                    raise AVMError(f"unsupported global field {immediate}", line)
+
+            elif op == 'bnz':
+                if _uint(pop(), line):
+                    pc = immediate
+            elif op == 'bz':
+                if not _uint(pop(), line):
+                    pc = immediate
+            elif op == 'b':
+                pc = immediate
+            elif op == 'callsub':
+                frames.append(pc)
+                pc = immediate
+            elif op == 'retsub':
+                pc = frames.pop()
+            elif op == 'return':
+                approved = bool(_uint(pop(), line))
+                break
+            elif op == 'err':
+                raise AVMError("err opcode executed", line)
+            elif op == 'assert':
+                if not _uint(pop(), line):
+                    raise AVMError("assert failed", line)
+
+            elif op in ('+', '-', '*', '/', '%', '<', '>', '<=', '>=', '&&', '||'):
+                b = _uint(pop(), line)
+                a = _uint(pop(), line)
+                if op == '+':
+                    result = a + b
+                elif op == '-':
+                    result = a - b
+                elif op == '*':
+                    result = a * b
+                elif op in ('/', '%'):
+                    if b == 0:
+                        raise AVMError("division by zero", line)
+                    result = a // b if op == '/' else a % b
+                elif op == '<':
+                    result = int(a < b)
+                elif op == '>':
+                    result = int(a > b)
+                elif op == '<=':
+                    result = int(a <= b)
+                elif op == '>=':
+                    result = int(a >= b)
+                elif op == '&&':
+                    result = int(bool(a and b))
+                else:
+                    result = int(bool(a or b))
+                if not 0 <= result <= UINT64_MAX:
+                    raise AVMError(f"{op} overflowed uint64", line)
+                push(result)
+            elif op in ('==', '!='):
+                b, a = pop(), pop()
+                if type(a) is not type(b):
+                    raise AVMError(f"{op} on mismatched types", line)
+                push(int((a == b) == (op == '==')))
+            elif op == '!':
+                push(int(_uint(pop(), line) == 0))
+            elif op == 'mulw':
+                b = _uint(pop(), line)
+                a = _uint(pop(), line)
+                product = a * b
+                push(product >> 64)
+                push(product & UINT64_MAX)
+            elif op == 'divw':
+                c = _uint(pop(), line)
+                low = _uint(pop(), line)
+                high = _uint(pop(), line)
+                if c == 0:
+                    raise AVMError("division by zero", line)
+                quotient = ((high << 64) | low) // c
+                if quotient > UINT64_MAX:
+                    raise AVMError("divw overflowed uint64", line)
+                push(quotient)
+            elif op == 'divmodw':
+                d_low, d_high = _uint(pop(), line), _uint(pop(), line)
+                n_low, n_high = _uint(pop(), line), _uint(pop(), line)
+                divisor = (d_high << 64) | d_low
+                if divisor == 0:
+                    raise AVMError("division by zero", line)
+                quotient, remainder = divmod((n_high << 64) | n_low, divisor)
+                push(quotient >> 64)
+                push(quotient & UINT64_MAX)
+                push(remainder >> 64)
+                push(remainder & UINT64_MAX)
+
+            elif op == 'pop':
+                pop()
+            elif op == 'dup':
+                push(stack[-1])
+            elif op == 'swap':
+                stack[-1], stack[-2] = stack[-2], stack[-1]
+            elif op == 'btoi':
+                value = _bytes(pop(), line)
+                if len(value) > 8:
+                    raise AVMError("btoi argument longer than 8 bytes", line)
+                push(int.from_bytes(value, 'big'))
+            elif op == 'itob':
+                push(itob(_uint(pop(), line)))
+            elif op == 'len':
+                push(len(_bytes(pop(), line)))
+            elif op == 'concat':
+                b = _bytes(pop(), line)
+                a = _bytes(pop(), line)
+                if len(a) + len(b) > 4096:
+                    raise AVMError("concat result exceeds 4096 bytes", line)
+                push(a + b)
+            elif op == 'getbyte':
+                index = _uint(pop(), line)
+                value = _bytes(pop(), line)
+                if index >= len(value):
+                    raise AVMError("getbyte index out of range", line)
+                push(value[index])
+            elif op == 'extract_uint64':
+                start = _uint(pop(), line)
+                value = _bytes(pop(), line)
+                if start + 8 > len(value):
+                    raise AVMError("extract_uint64 out of range", line)
+                push(int.from_bytes(value[start:start + 8], 'big'))
+            elif op == 'log':
+                logs.append(_bytes(pop(), line))
+
+            elif op == 'app_global_get':
+                push(global_state.get(_bytes(pop(), line), 0))
+            elif op == 'app_global_put':
+                value = pop()
+                global_state[_bytes(pop(), line)] = value
+            elif op == 'app_global_del':
+                global_state.pop(_bytes(pop(), line), None)
+            elif op == 'app_local_get':
+                key = _bytes(pop(), line)
+                push(local_for(pop(), line).get(key, 0))
+            elif op == 'app_local_put':
+                value = pop()
+                key = _bytes(pop(), line)
+                local_for(pop(), line)[key] = value
+            elif op == 'app_local_del':
+                key = _bytes(pop(), line)
+                local_for(pop(), line).pop(key, None)
+            elif op == 'app_opted_in':
+                pop()   # application id: only one app is simulated
+                push(int(is_opted_in(pop())))
+            else:
+                raise AVMError(f"unsupported opcode {op}", line)
+
+        if approved is None:
+            # Falling off the end approves when exactly one non-zero uint64 is left
+            approved = len(stack) == 1 and isinstance(stack[0], int) and stack[0] != 0
+    except AVMError as exc:
+        return CallResult(False, cost, logs, str(exc))
+    except IndexError:
+        return CallResult(False, cost, logs, f"line {code[pc - 1][3]}: stack underflow")
+
+    if approved:
+        ledger.global_state = global_state
+        ledger.local_state.update(local_state)
+    return CallResult(approved, cost, logs)
+
+
+def load_contract(name):
+    """Build (using the cache) and decode a contract's approval program"""
+    from build_contracts import BUILD_DIR, build_contracts
+
+    status = build_contracts([name])[name]
+    if status.startswith('error'):
+        raise RuntimeError(f"{name}: {status}")
+    return Program.from_file(os.path.join(BUILD_DIR, f"{name}_approval.teal"))
+
+
+def _swap_algo_calls(rng, accounts, calls):
+    """Synthetic /swapAlgo workload with min outputs quoted by the shared integer math"""
+    from amm_math import swap_output_micro
+    from swap_algo import ALGO_RESERVE, BUY_ALGO, SELL_ALGO, TOKEN_RESERVE, encode_batch_legs
+
+    def quote(direction, amount):
+        if direction == SELL_ALGO:
+            return swap_output_micro(amount, ALGO_RESERVE, TOKEN_RESERVE)
+        return swap_output_micro(amount, TOKEN_RESERVE, ALGO_RESERVE)
+
+    for _ in range(calls):
+        sender = rng.choice(accounts)
+        amount = rng.randint(1, 5000) * 10 ** 6
+        kind = rng.random()
+        if kind < 0.5:
+            # Exact on-chain output as the minimum: passes only if both sides round identically
+            yield 'swap_algo', Transaction(sender, [b'swap_algo', amount, 31566704, quote(SELL_ALGO, amount)])
+        elif kind < 0.65:
+            yield 'buy_algo', Transaction(sender, [b'buy_algo', amount, quote(BUY_ALGO, amount)])
+        elif kind < 0.8:
+            yield 'sell_algo', Transaction(sender, [b'sell_algo', amount, quote(SELL_ALGO, amount)])
+        elif kind < 0.95:
+            legs = []
+            for _ in range(rng.randint(2, 8)):
+                direction = rng.choice((SELL_ALGO, BUY_ALGO))
+                leg_amount = rng.randint(1, 5000) * 10 ** 6
+                legs.append((direction, leg_amount, quote(direction, leg_amount)))
+            yield 'swap_batch', Transaction(sender, [b'swap_batch', encode_batch_legs(legs)])
+        else:
+            yield 'get_stats', Transaction(sender, [b'get_stats'])
+
+
+def _get_balance_calls(rng, accounts, calls):
+    """Synthetic /getBalance workload"""
+    for _ in range(calls):
+        sender = rng.choice(accounts)
+        kind = rng.random()
+        if kind < 0.6:
+            yield 'update_balance', Transaction(
+                sender, [b'update_balance', rng.randint(0, 10 ** 6), rng.randint(0, 50)]
+            )
+        elif kind < 0.85:
+            yield 'get_balance', Transaction(sender, [b'get_balance'])
+        elif kind < 0.95:
+            yield 'calculate_yield', Transaction(sender, [b'calculate_yield'])
+        else:
+            yield 'global_stats', Transaction(sender, [b'global_stats'])
+
+
+WORKLOADS = {
+    'swap_algo': _swap_algo_calls,
+    'get_balance': _get_balance_calls
+}
+
+
+def run_bench(name, calls=5000, accounts=100, seed=7, budget=APP_CALL_BUDGET):
+    """Create the app, opt accounts in and replay a synthetic workload; return a report"""
+    program = load_contract(name)
+    ledger = Ledger()
+    rng = random.Random(seed)
+    senders = [address(f"{name}-{i}") for i in range(accounts)]
+    per_method = defaultdict(lambda: {'calls': 0, 'approved': 0, 'cost_total': 0, 'cost_max': 0, 'errors': {}})
+
+    def record(method, result):
+        stats = per_method[method]
+        stats['calls'] += 1
+        stats['approved'] += result.approved
+        stats['cost_total'] += result.cost
+        stats['cost_max'] = max(stats['cost_max'], result.cost)
+        if result.error:
+            stats['errors'][result.error] = stats['errors'].get(result.error, 0) + 1
+
+    record('create', evaluate(program, ledger, Transaction(senders[0], application_id=0)))
+    for sender in senders:
+        record('optin', evaluate(program, ledger, Transaction(sender, on_completion='OptIn')))
+        ledger.advance()
+    storage_before = ledger.storage_report()
+
+    started = time.perf_counter()
+    for method, txn in WORKLOADS[name](rng, senders, calls):
+        ledger.advance()
+        record(method, evaluate(program, ledger, txn, budget))
+    elapsed = time.perf_counter() - started
+
+    methods = {}
+    for method, stats in per_method.items():
+        methods[method] = {
+            'calls': stats['calls'],
+            'approved': stats['approved'],
+            'mean_cost': stats['cost_total'] / stats['calls'],
+            'max_cost': stats['cost_max'],
+            'errors': stats['errors']
+        }
+    return {
+        'contract': name,
+        'calls': calls,
+        'accounts': accounts,
+        'calls_per_second': calls / elapsed if elapsed else 0.0,
+        'methods': methods,
+        'storage_after_optin': storage_before,
+        'storage_after_workload': ledger.storage_report()
+    }
+
+
+def format_report(report):
+    """Per-method cost table and state growth summary"""
+    lines = [
+        f"🧪 {report['contract']}: {report['calls']:,} calls from {report['accounts']:,} accounts "
+        f"({report['calls_per_second']:,.0f} simulated calls/s)",
+        f"   {'Method':<16}{'Calls':>8}{'Approved':>10}{'Mean cost':>11}{'Max cost':>10}"
+    ]
+    for method, stats in report['methods'].items():
+        lines.append(
+            f"   {method:<16}{stats['calls']:>8,}{stats['approved']:>10,}"
+            f"{stats['mean_cost']:>11.1f}{stats['max_cost']:>10}"
+        )
+        for error, count in stats['errors'].items():
+            lines.append(f"      ❌ {count:,} x {error}")
+    before, after = report['storage_after_optin'], report['storage_after_workload']
+    lines.append("   State:")
+    for key, value in after.items():
+        lines.append(f"      {key.replace('_', ' ')}: {before[key]:,} → {value:,}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run contracts against an in-memory AVM ledger")
+    parser.add_argument('contracts', nargs='*', help=f"contracts to bench (default: {', '.join(WORKLOADS)})")
+    parser.add_argument('--calls', type=int, default=5000, help="workload calls per contract")
+    parser.add_argument('--accounts', type=int, default=100, help="opted-in accounts")
+    parser.add_argument('--seed', type=int, default=7, help="workload random seed")
+    parser.add_argument('--budget', type=int, default=APP_CALL_BUDGET,
+                        help="opcode budget per call (multiples of 700 model pooled group budget)")
+    parser.add_argument('--json', action='store_true', help="print the reports as JSON")
+    args = parser.parse_args()
+
+    names = args.contracts or list(WORKLOADS)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"no workload for: {', '.join(unknown)}")
+
+    reports = [
+        run_bench(name, calls=args.calls, accounts=args.accounts, seed=args.seed, budget=args.budget)
+        for name in names
+    ]
+    if args.json:
+        json.dump(reports, sys.stdout, indent=2)
+        print()
+        return
+    for report in reports:
+        print(format_report(report))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Off-chain Benchmarks
+====================
+Reproducible benchmarks for the quoting, routing and strategy hot paths
+behind the Aether AI "/connectTinyman" and "/openDEX" commands.
+
+Features:
+- Seeded synthetic pool universes of any size (10, 1k and 100k pools by default)
+  shaped like Algorand's: long-tail tokens paired with a few hub assets
+- Latency percentiles and throughput per operation, peak traced memory
+  measured in a separate pass so tracing doesn't skew the timings
+- Baseline file comparison that fails on latency or memory regressions
+
+Usage:
+    python bench_offchain.py                          # all sizes, print the table
+    python bench_offchain.py --sizes 10,1000 --check  # compare with bench_baseline.json
+    python bench_offchain.py --save-baseline          # accept the current numbers
+
+Timings are machine dependent, so bench_baseline.json is not committed: record it
+with --save-baseline on the machine that runs --check.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from connect_tinyman import connect_tinyman_contract
+from open_dex import open_dex_contract
+from pool_registry import PoolRegistry
+
+DEFAULT_SIZES = (10, 1000, 100000)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+HUB_ASSETS = (('ALGO', 0), ('USDC', 31566704), ('USDT', 312769))
+VENUES = ('tinyman', 'algofi', 'pact')
+VENUE_FEES = {'tinyman': 0.0025, 'algofi': 0.003, 'pact': 0.002}
+STRATEGIES = ('yield_farming', 'arbitrage_hunting', 'balanced_portfolio', 'high_yield_focus')
+MIN_DELTA_US = 2.0      # slowdowns smaller than this are timer noise on microsecond medians
+
+
+def synthetic_registry(pool_count, seed=7):
+    """
+    Registry of pool_count pools: hub pairs on every venue, then long-tail
+    tokens each paired with ALGO and often with a stablecoin hub.
+    """
+    rng = random.Random(seed)
+    registry = PoolRegistry()
+    for symbol, asset_id in HUB_ASSETS:
+        registry.register_asset(symbol, asset_id)
+
+    def add(asset_1, asset_2, venue):
+        reserve = rng.uniform(1e4, 5e6)
+        price = rng.uniform(0.05, 20.0)
+        registry.add_pool(
+            f"{asset_1}_{asset_2}_{venue}", venue, asset_1, asset_2,
+            reserve, reserve * price, VENUE_FEES[venue],
+            apr=rng.uniform(0.0, 0.4), volume_24h=rng.uniform(0, reserve), total_liquidity=2 * reserve
+        )
+
+    hub_pairs = [(a, b) for i, (a, _) in enumerate(HUB_ASSETS) for b, _ in HUB_ASSETS[i + 1:]]
+    for asset_1, asset_2 in hub_pairs:
+        for venue in VENUES:
+            if len(registry) < pool_count:
+                add(asset_1, asset_2, venue)
+
+    token = 0
+    while len(registry) < pool_count:
+        token += 1
+        symbol = f"TK{token:06d}"
+        registry.register_asset(symbol, 1000000000 + token)
+        add('ALGO', symbol, rng.choice(VENUES))
+        if len(registry) < pool_count and rng.random() < 0.6:
+            add(rng.choice(('USDC', 'USDT')), symbol, rng.choice(VENUES))
+    return registry
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def measure(call, make_args, max_iterations=2000, time_budget=1.0, memory_iterations=50, repeats=5,
+            reset=None):
+    """
+    Time call(*make_args()) until max_iterations or time_budget is reached.
+
+    The calls are split into `repeats` rounds and p50 is the lowest round
+    median: a scheduler hiccup or frequency change slows a round down, never
+    speeds it up, so the minimum is the stable number to compare. Tail
+    percentiles and throughput use every sample. reset, if given, runs
+    before each round so every round replays the same workload.
+    make_args runs outside the timed region (it may also reset caches).
+    Peak memory is traced over a shorter second pass.
+    """
+    samples, medians = [], []
+    for _ in range(repeats):
+        round_samples = []
+        if reset is not None:
+            reset()
+        gc.collect()
+        started = time.perf_counter()
+        while len(round_samples) < max(max_iterations // repeats, 1) and (
+            len(round_samples) < 20 or time.perf_counter() - started < time_budget / repeats
+        ):
+            args = make_args()
+            t0 = time.perf_counter()
+            call(*args)
+            round_samples.append(time.perf_counter() - t0)
+        round_samples.sort()
+        medians.append(_percentile(round_samples, 0.50))
+        samples.extend(round_samples)
+    samples.sort()
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(min(memory_iterations, len(samples))):
+        args = make_args()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        call(*args)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    total = sum(samples)
+    return {
+        'iterations': len(samples),
+        'p50_us': min(medians) * 1e6,
+        'p95_us': _percentile(samples, 0.95) * 1e6,
+        'p99_us': _percentile(samples, 0.99) * 1e6,
+        'ops_per_second': len(samples) / total if total else 0.0,
+        'peak_kib': peak / 1024
+    }
+
+
+def run_size(pool_count, seed=7, max_iterations=2000, time_budget=1.0, repeats=5):
+    """Benchmark every operation against one synthetic universe"""
+    rng = random.Random(seed)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    registry = synthetic_registry(pool_count, seed)
+    tinyman = connect_tinyman_contract(registry)
+    router = open_dex_contract(registry)
+    setup_seconds = time.perf_counter() - t0
+    setup_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tinyman_pools = list(tinyman.tinyman_pools.values())
+    tail_tokens = [symbol for symbol in registry.asset_ids if symbol.startswith('TK')]
+    route_tokens = tail_tokens or [symbol for symbol, _ in HUB_ASSETS]
+
+    def swap_args():
+        pool = rng.choice(tinyman_pools)
+        asset = pool.asset_1 if rng.random() < 0.5 else pool.asset_2
+        return pool.pool_id, asset, rng.uniform(1, 5000)
+
+    def optimal_args():
+        return rng.uniform(1000, 100000), rng.choice(('low', 'medium', 'high'))
+
+    def strategy_args():
+        return rng.choice(STRATEGIES), {'investment_amount': rng.choice((5000, 10000, 25000))}
+
+    def cold_strategy_args():
+        tinyman.strategy_cache.clear()
+        return strategy_args()
+
+    def route_args():
+        token_in, token_out = rng.sample(route_tokens, 2) if len(route_tokens) > 1 else ('ALGO', 'USDC')
+        return token_in, token_out, rng.uniform(10, 1000)
+
+    operations = {
+        'calculate_swap_output': (tinyman.calculate_swap_output, swap_args),
+        'find_optimal_pools': (tinyman.find_optimal_pools, optimal_args),
+        'execute_tinyman_strategy[cold]': (tinyman.execute_tinyman_strategy, cold_strategy_args),
+        'execute_tinyman_strategy[cached]': (tinyman.execute_tinyman_strategy, strategy_args),
+        'find_best_route': (router.find_best_route, route_args)
+    }
+
+    results = {}
+    for name, (call, make_args) in operations.items():
+        results[name] = measure(
+            call, make_args, max_iterations, time_budget, repeats=repeats, reset=lambda: rng.seed(seed)
+        )
+    return {
+        'pools': pool_count,
+        'setup_seconds': setup_seconds,
+        'setup_peak_mib': setup_peak / 2 ** 20,
+        'operations': results
+    }
+
+
+def flatten(reports):
+    """{'<pools>/<operation>': {'p50_us': ..., 'peak_kib': ...}} as stored in the baseline"""
+    return {
+        f"{report['pools']}/{name}": {'p50_us': stats['p50_us'], 'p99_us': stats['p99_us'], 'peak_kib': stats['peak_kib']}
+        for report in reports
+        for name, stats in report['operations'].items()
+    }
+
+
+def compare_baseline(reports, baseline, tolerance=0.25, min_delta_us=MIN_DELTA_US):
+    """
+    Rows of (key, metric, baseline, current) and whether anything regressed.
+    A metric regresses when it exceeds its baseline by more than tolerance;
+    latency changes under min_delta_us and tiny memory peaks (< 4 KiB) are
+    ignored as timer and allocator noise.
+    """
+    rows, regressed = [], False
+    for key, metrics in flatten(reports).items():
+        for metric in ('p50_us', 'peak_kib'):
+            before = baseline.get(key, {}).get(metric)
+            current = metrics[metric]
+            if before is not None and current > before * (1 + tolerance):
+                if metric == 'peak_kib' and current >= 4:
+                    regressed = True
+                elif metric == 'p50_us' and current - before >= min_delta_us:
+                    regressed = True
+            rows.append((key, metric, before, current))
+    return rows, regressed
+
+
+def format_report(report):
+    """Per-operation latency, throughput and memory table for one universe"""
+    lines = [
+        f"⏱️  {report['pools']:,} pools (setup {report['setup_seconds']:.2f}s, "
+        f"peak {report['setup_peak_mib']:.1f} MiB)",
+        f"   {'Operation':<34}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}{'ops/s':>12}{'peak KiB':>10}"
+    ]
+    for name, stats in report['operations'].items():
+        lines.append(
+            f"   {name:<34}{stats['p50_us']:>10.1f}{stats['p95_us']:>10.1f}{stats['p99_us']:>10.1f}"
+            f"{stats['ops_per_second']:>12,.0f}{stats['peak_kib']:>10.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def format_comparison(rows):
+    """Baseline versus current table"""
+    lines = [f"   {'Benchmark':<44}{'Metric':<10}{'Baseline':>11}{'Current':>11}{'Change':>9}"]
+    for key, metric, before, current in rows:
+        if before is None:
+            lines.append(f"   {key:<44}{metric:<10}{'-':>11}{current:>11.1f}{'-':>9}")
+        else:
+            change = (current / before - 1) if before else 0.0
+            lines.append(f"   {key:<44}{metric:<10}{before:>11.1f}{current:>11.1f}{change:>+9.0%}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark off-chain quoting, routing and strategies")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated pool universe sizes")
+    parser.add_argument('--seed', type=int, default=7, help="universe and workload random seed")
+    parser.add_argument('--iterations', type=int, default=2000, help="max timed calls per operation")
+    parser.add_argument('--time-budget', type=float, default=1.0, help="seconds per operation")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before --check fails")
+    parser.add_argument('--min-delta-us', type=float, default=MIN_DELTA_US,
+                        help="latency changes smaller than this never fail --check")
+    parser.add_argument('--repeats', type=int, default=5, help="timing rounds per operation (p50 is the best round)")
+    parser.add_argument('--check', nargs='?', const=BASELINE_PATH, metavar='BASELINE',
+                        help="fail if an operation regressed against the baseline file")
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE_PATH, metavar='BASELINE',
+                        help="write the current numbers as the new baseline")
+    parser.add_argument('--json', action='store_true', help="print the reports as JSON")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    reports = [run_size(size, args.seed, args.iterations, args.time_budget, args.repeats) for size in sizes]
+
+    if args.json:
+        json.dump(reports, sys.stdout, indent=2)
+        print()
+    else:
+        for report in reports:
+            print(format_report(report))
+            print()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(flatten(reports), f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Baseline written to {args.save_baseline}")
+
+    if args.check:
+        if not os.path.exists(args.check):
+            print(f"❌ No baseline at {args.check}; record one on this machine with --save-baseline")
+            sys.exit(2)
+        with open(args.check) as f:
+            baseline = json.load(f)
+        rows, regressed = compare_baseline(reports, baseline, args.tolerance, args.min_delta_us)
+        print("📉 Versus baseline:")
+        print(format_comparison(rows))
+        if regressed:
+            print(f"❌ Regression beyond {args.tolerance:.0%} tolerance")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Build Contracts
+===============
+Compiles every PyTeal program in this folder to TEAL for deployment of the
+Aether AI agent command contracts.
+
+A module is a contract when it defines both approval_program() and
+clear_state_program() at the top level.
+
+Features:
+- Contracts compiled in parallel worker processes
+- Outputs cached by a hash of the contract source, the local modules it
+  imports, the PyTeal version and the TEAL version
+- Unchanged contracts are skipped, so a no-op build costs only the hashing
+- Outputs land in contracts/build/ instead of the working directory
+
+Usage:
+    python build_contracts.py                 # build everything that changed
+    python build_contracts.py swap_algo       # build selected contracts
+    python build_contracts.py --force         # ignore the cache
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import PackageNotFoundError, version as package_version
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(os.path.dirname(EXAMPLES_DIR), 'build')
+MANIFEST_NAME = 'manifest.json'
+TEAL_VERSION = 8
+
+
+def pyteal_version():
+    """Installed PyTeal version, part of every cache key"""
+    try:
+        return package_version('pyteal')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def _parse(name, source_dir):
+    with open(os.path.join(source_dir, name + '.py'), 'rb') as f:
+        source = f.read()
+    return source, ast.parse(source)
+
+
+def _local_imports(tree, source_dir):
+    """Names of sibling modules imported by a parsed module"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return {name for name in names if os.path.isfile(os.path.join(source_dir, name + '.py'))}
+
+
+def discover_contracts(source_dir=EXAMPLES_DIR):
+    """Module names that define both approval_program and clear_state_program"""
+    contracts = []
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.endswith('.py'):
+            continue
+        name = filename[:-3]
+        _, tree = _parse(name, source_dir)
+        functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+        if {'approval_program', 'clear_state_program'} <= functions:
+            contracts.append(name)
+    return contracts
+
+
+def source_hash(name, source_dir=EXAMPLES_DIR, teal_version=TEAL_VERSION):
+    """Cache key covering a contract, its local imports and the compiler versions"""
+    digest = hashlib.sha256()
+    digest.update(f"pyteal={pyteal_version()};teal={teal_version}".encode())
+
+    # Follow sibling imports so edits to shared helpers (e.g. amm_math) rebuild dependants
+    sources, pending = {}, [name]
+    while pending:
+        module = pending.pop()
+        if module in sources:
+            continue
+        sources[module], tree = _parse(module, source_dir)
+        pending.extend(_local_imports(tree, source_dir))
+
+    for module in sorted(sources):
+        digest.update(module.encode() + b'\0' + sources[module] + b'\0')
+    return digest.hexdigest()
+
+
+def _output_paths(name, build_dir):
+    return (
+        os.path.join(build_dir, f"{name}_approval.teal"),
+        os.path.join(build_dir, f"{name}_clear.teal")
+    )
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _compile_contract(name, source_dir, build_dir, teal_version):
+    """Worker: import one contract module and write its approval and clear programs"""
+    from pyteal import Mode, compileTeal
+
+    if source_dir not in sys.path:
+        sys.path.insert(0, source_dir)
+    module = importlib.import_module(name)
+
+    started = time.perf_counter()
+    approval_teal = compileTeal(module.approval_program(), Mode.Application, version=teal_version)
+    clear_teal = compileTeal(module.clear_state_program(), Mode.Application, version=teal_version)
+    elapsed = time.perf_counter() - started
+
+    approval_path, clear_path = _output_paths(name, build_dir)
+    _write_atomic(approval_path, approval_teal)
+    _write_atomic(clear_path, clear_teal)
+    return name, elapsed
+
+
+def load_manifest(build_dir=BUILD_DIR):
+    """Cache manifest: contract name -> {'hash': ..., 'pyteal': ..., 'teal_version': ...}"""
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def build_contracts(names=None, source_dir=EXAMPLES_DIR, build_dir=BUILD_DIR,
+                    teal_version=TEAL_VERSION, force=False, max_workers=None):
+    """
+    Compile contracts whose cache key changed and return a build report.
+
+    The report maps each contract name to 'cached', 'compiled' or an error
+    message; failed contracts keep no manifest entry so they are retried.
+    """
+    names = discover_contracts(source_dir) if names is None else list(names)
+    os.makedirs(build_dir, exist_ok=True)
+    manifest = load_manifest(build_dir)
+
+    report = {}
+    stale = {}
+    for name in names:
+        key = source_hash(name, source_dir, teal_version)
+        cached = manifest.get(name)
+        outputs_exist = all(os.path.isfile(path) for path in _output_paths(name, build_dir))
+        if not force and cached and cached.get('hash') == key and outputs_exist:
+            report[name] = 'cached'
+        else:
+            stale[name] = key
+
+    if stale:
+        workers = min(len(stale), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                name: pool.submit(_compile_contract, name, source_dir, build_dir, teal_version)
+                for name in stale
+            }
+            for name, future in futures.items():
+                try:
+                    _, elapsed = future.result()
+                except Exception as exc:
+                    manifest.pop(name, None)
+                    report[name] = f"error: {type(exc).__name__}: {exc}"
+                else:
+                    manifest[name] = {
+                        'hash': stale[name],
+                        'pyteal': pyteal_version(),
+                        'teal_version': teal_version,
+                        'compile_seconds': round(elapsed, 4)
+                    }
+                    report[name] = 'compiled'
+
+        _write_atomic(
+            os.path.join(build_dir, MANIFEST_NAME),
+            json.dumps(manifest, indent=2, sort_keys=True) + '\n'
+        )
+
+    return {name: report[name] for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the PyTeal contracts with a content-hashed cache")
+    parser.add_argument('contracts', nargs='*', help="contract module names (default: all)")
+    parser.add_argument('--build-dir', default=BUILD_DIR, help="output directory for .teal files")
+    parser.add_argument('--force', action='store_true', help="recompile even if the cache is fresh")
+    parser.add_argument('--workers', type=int, default=None, help="number of compiler processes")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = build_contracts(
+        args.contracts or None, build_dir=args.build_dir, force=args.force, max_workers=args.workers
+    )
+    elapsed = time.perf_counter() - started
+
+    print("🔨 Contract Build:")
+    for name, status in report.items():
+        icon = '✅' if status == 'compiled' else '⚡' if status == 'cached' else '❌'
+        print(f"   {icon} {name}: {status}")
+    print(f"   Output: {args.build_dir}")
+    print(f"   Finished in {elapsed:.2f}s")
+
+    if any(status.startswith('error') for status in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,122 +9,242 @@ Features:
 - Advanced pool analytics
 - Impermanent loss calculation
 - Yield farming optimization
+- Monte Carlo LP outcome simulation
 """
 
-def connect_tinyman_contract():
+import pickle
+
+import numpy as np
+
+from amm_math import (
+    DEFAULT_SLIPPAGE_BPS,
+    UINT64_MAX,
+    break_even_fee_return,
+    constant_product_output,
+    fee_to_bps,
+    impermanent_loss,
+    min_output_micro,
+    swap_output_micro,
+    to_micro
+)
+from arbitrage import ArbitrageDetector
+from lp_simulator import LPSimulationParams, LPSimulator
+from pool_registry import default_registry
+from result_cache import TTLCache, normalize_params
+from score_index import ScoreIndex
+from token_graph import TokenGraph
+
+# Minimum pool liquidity for each risk tolerance
+RISK_TIERS = {
+    'low': 1000000,
+    'medium': 500000,
+    'high': 100000
+}
+
+# Parameter defaults shared by the strategies, applied before cache lookups
+STRATEGY_DEFAULTS = {'investment_amount': 10000}
+
+def connect_tinyman_contract(registry=None):
     """
     Smart contract for advanced Tinyman DEX integration
     Provides comprehensive pool management and analytics
     """
     
     class TinymanConnector:
-        def __init__(self):
+        def __init__(self, registry=None):
+            # Pool state lives in the shared registry, also used by the DEX router
+            self.registry = registry if registry is not None else default_registry()
             self.tinyman_pools = {
-                'ALGO_USDC': {
-                    'asset_1': 'ALGO',
-                    'asset_2': 'USDC',
-                    'asset_1_id': 0,
-                    'asset_2_id': 31566704,
-                    'total_liquidity': 2100000,  # $2.1M
-                    'reserve_1': 1050000,        # ALGO reserve
-                    'reserve_2': 1050000,        # USDC reserve
-                    'fee': 0.0025,               # 0.25%
-                    'apr': 0.12,                 # 12% APR
-                    'volume_24h': 450000
-                },
-                'ALGO_USDT': {
-                    'asset_1': 'ALGO',
-                    'asset_2': 'USDT',
-                    'asset_1_id': 0,
-                    'asset_2_id': 312769,
-                    'total_liquidity': 1800000,  # $1.8M
-                    'reserve_1': 900000,
-                    'reserve_2': 900000,
-                    'fee': 0.0025,
-                    'apr': 0.095,                # 9.5% APR
-                    'volume_24h': 320000
-                },
-                'ALGO_AKTA': {
-                    'asset_1': 'ALGO',
-                    'asset_2': 'AKTA',
-                    'asset_1_id': 0,
-                    'asset_2_id': 523683256,
-                    'total_liquidity': 450000,   # $450K
-                    'reserve_1': 225000,
-                    'reserve_2': 225000,
-                    'fee': 0.0025,
-                    'apr': 0.18,                 # 18% APR
-                    'volume_24h': 85000
-                },
-                'ALGO_GARD': {
-                    'asset_1': 'ALGO',
-                    'asset_2': 'GARD',
-                    'asset_1_id': 0,
-                    'asset_2_id': 684649988,
-                    'total_liquidity': 320000,   # $320K
-                    'reserve_1': 160000,
-                    'reserve_2': 160000,
-                    'fee': 0.0025,
-                    'apr': 0.22,                 # 22% APR
-                    'volume_24h': 65000
-                }
+                pool.pool_id: pool
+                for pool in self.registry.records(self.registry.venue_pools.get('tinyman', []))
             }
+            
+            self.token_graph = TokenGraph.from_registry(self.registry, ('tinyman',))
+            self.arbitrage = ArbitrageDetector(self.token_graph)
+            
+            # Recommendation ranking kept current as pools change
+            self.score_index = ScoreIndex(RISK_TIERS)
+            for pool in self.tinyman_pools.values():
+                self._index_pool(pool)
+            
+            # Strategy results keyed on pool-state version, so any pool update invalidates them
+            self.strategy_cache = TTLCache(maxsize=256, ttl=30.0)
+            
+            # Worker processes for LP simulations, started on first use
+            self.lp_simulator = LPSimulator()
+            
+            self.registry.subscribe(self._on_pools_changed)
+        
+        def _on_pools_changed(self, pool_ids):
+            """Reprice graph edges and re-check arbitrage for updated Tinyman pools; add new ones"""
+            added = False
+            for pool_id in pool_ids:
+                pool = self.tinyman_pools.get(pool_id)
+                if pool is None:
+                    pool = self.registry.pool(pool_id)
+                    if pool is None or pool.venue != 'tinyman':
+                        continue
+                    # Registered after the connector was built
+                    self.tinyman_pools[pool_id] = pool
+                    self.token_graph.add_pool(
+                        pool_id, 'tinyman', pool.asset_1, pool.asset_2, pool.fee, pool.reserve_1, pool.reserve_2
+                    )
+                    self._index_pool(pool)
+                    added = True
+                    continue
+                self.token_graph.update_reserves('tinyman', pool_id, pool.reserve_1, pool.reserve_2, pool.fee)
+                self.arbitrage.update_pool('tinyman', pool_id)
+                self._index_pool(pool)
+            if added:
+                self.arbitrage.rebuild()
+        
+        def _pool_score(self, pool):
+            """Blend liquidity, yield and volume into a 0-1 recommendation score"""
+            liquidity_score = min(pool.total_liquidity / 1000000, 1)  # Max score at $1M+
+            yield_score = pool.apr / 0.25  # Max score at 25% APR
+            # Liquidity utilization; pools registered without liquidity score zero here
+            volume_score = min(pool.volume_24h / pool.total_liquidity, 1) if pool.total_liquidity else 0
+            
+            return (liquidity_score + yield_score + volume_score) / 3
+        
+        def _index_pool(self, pool):
+            """Re-rank one pool in the per-tier score index"""
+            self.score_index.update(pool.pool_id, self._pool_score(pool), pool.total_liquidity, pool.row)
+        
+        def update_pool_reserves(self, pool_id, reserve_1, reserve_2):
+            """Record fresh reserves for a pool; dependent indexes update via the registry"""
+            self.registry.update_pool(pool_id, reserve_1=reserve_1, reserve_2=reserve_2)
+        
+        def resolve_pool(self, pool_ref):
+            """Tinyman pool for a pool id, an 'A/B' pair string or an (asset, asset) pair, in either order"""
+            pool = self.tinyman_pools.get(pool_ref)
+            if pool is not None:
+                return pool
+            if isinstance(pool_ref, str) and '/' not in pool_ref:
+                return None
+            try:
+                # Canonical (asset id, asset id) index in the registry; symbols, aliases and ids all resolve
+                return self.registry.pool_for_pair(pool_ref, 'tinyman')
+            except (KeyError, ValueError, TypeError):
+                return None
         
         def get_pool_info(self, pool_id):
             """Get comprehensive pool information"""
-            if pool_id in self.tinyman_pools:
-                pool = self.tinyman_pools[pool_id]
+            pool = self.resolve_pool(pool_id)
+            if pool is not None:
                 return {
-                    'pool_id': pool_id,
-                    'assets': f"{pool['asset_1']}/{pool['asset_2']}",
-                    'total_liquidity': pool['total_liquidity'],
-                    'current_ratio': pool['reserve_1'] / pool['reserve_2'],
-                    'fee_rate': pool['fee'],
-                    'annual_percentage_rate': pool['apr'],
-                    'daily_volume': pool['volume_24h'],
-                    'liquidity_utilization': pool['volume_24h'] / pool['total_liquidity']
+                    'pool_id': pool.pool_id,
+                    'assets': f"{pool.asset_1}/{pool.asset_2}",
+                    'total_liquidity': pool.total_liquidity,
+                    'current_ratio': pool.reserve_1 / pool.reserve_2,
+                    'fee_rate': pool.fee,
+                    'annual_percentage_rate': pool.apr,
+                    'daily_volume': pool.volume_24h,
+                    'liquidity_utilization': pool.volume_24h / pool.total_liquidity if pool.total_liquidity else 0
                 }
             return None
         
         def calculate_swap_output(self, pool_id, input_asset, input_amount):
             """Calculate expected output for a swap in Tinyman pool"""
-            if pool_id not in self.tinyman_pools:
+            pool = self.resolve_pool(pool_id)
+            if pool is None:
                 return None
             
-            pool = self.tinyman_pools[pool_id]
+            input_reserve, output_reserve, output_asset = self._swap_sides(pool, input_asset)
             
-            # Determine which asset is being input
-            if input_asset == pool['asset_1']:
-                input_reserve = pool['reserve_1']
-                output_reserve = pool['reserve_2']
-                output_asset = pool['asset_2']
-            else:
-                input_reserve = pool['reserve_2']
-                output_reserve = pool['reserve_1']
-                output_asset = pool['asset_1']
+            # Shared constant product math (same quote path as the DEX router)
+            output_after_fees, fee_amount, price_impact = constant_product_output(
+                input_amount, input_reserve, output_reserve, pool.fee
+            )
             
-            # AMM formula: output = (input * output_reserve) / (input_reserve + input)
-            # Minus fees: output * (1 - fee)
-            raw_output = (input_amount * output_reserve) / (input_reserve + input_amount)
-            output_after_fees = raw_output * (1 - pool['fee'])
+            # Exact micro-unit quote, identical to the on-chain swap check; None when
+            # the amounts can't be expressed as uint64 (the float quote still stands)
+            expected_micro = minimum_micro = None
+            try:
+                micro_amounts = [to_micro(amount) for amount in (input_amount, input_reserve, output_reserve)]
+                if all(0 <= amount <= UINT64_MAX for amount in micro_amounts):
+                    expected_micro = swap_output_micro(*micro_amounts, fee_to_bps(pool.fee))
+                    minimum_micro = min_output_micro(expected_micro, DEFAULT_SLIPPAGE_BPS)
+            except (OverflowError, ValueError):
+                # inf / NaN amounts, or a result wider than the contract's uint64 math
+                expected_micro = minimum_micro = None
             
             return {
                 'input_asset': input_asset,
                 'input_amount': input_amount,
                 'output_asset': output_asset,
                 'expected_output': output_after_fees,
-                'fee_amount': raw_output * pool['fee'],
-                'price_impact': (input_amount / input_reserve) * 100,  # Percentage
-                'minimum_received': output_after_fees * 0.99  # 1% slippage tolerance
+                'fee_amount': fee_amount,
+                'price_impact': price_impact,  # Percentage
+                'minimum_received': output_after_fees * 0.99,  # 1% slippage tolerance
+                'expected_output_micro': expected_micro,
+                'minimum_received_micro': minimum_micro
             }
         
+        def quote_micro(self, pool_id, input_asset, input_micro, slippage_bps=DEFAULT_SLIPPAGE_BPS):
+            """Integer quote in micro-units: (expected_output, min_output) for transaction building"""
+            pool = self.resolve_pool(pool_id)
+            if pool is None:
+                raise KeyError(f"Unknown Tinyman pool: {pool_id}")
+            input_reserve, output_reserve, _ = self._swap_sides(pool, input_asset)
+            expected = swap_output_micro(
+                input_micro, to_micro(input_reserve), to_micro(output_reserve), fee_to_bps(pool.fee)
+            )
+            return expected, min_output_micro(expected, slippage_bps)
+        
+        def _swap_sides(self, pool, input_asset):
+            """(input_reserve, output_reserve, output_asset) for swapping input_asset in a pool"""
+            # Determine which asset is being input (symbol, alias or asset id)
+            if self.registry.symbol(input_asset) == pool.asset_1:
+                return pool.reserve_1, pool.reserve_2, pool.asset_2
+            return pool.reserve_2, pool.reserve_1, pool.asset_1
+        
+        def calculate_swap_outputs(self, pool_ids, directions, input_amounts, slippage=0.01):
+            """
+            Batch version of calculate_swap_output over NumPy arrays.
+            
+            pool_ids may be pool id strings or registry row indices;
+            directions is 0 when asset_1 is the input and 1 when asset_2 is.
+            Returns a dict of arrays aligned with the inputs.
+            """
+            registry = self.registry
+            rows = self._rows(pool_ids)
+            asset_2_in = np.asarray(directions, dtype=np.intp) == 1
+            amounts = np.asarray(input_amounts, dtype=np.float64)
+            
+            # Zero-copy views over the registry's columns; gathers below copy out
+            reserve_1 = np.frombuffer(registry.reserve_1, dtype=np.float64)[rows]
+            reserve_2 = np.frombuffer(registry.reserve_2, dtype=np.float64)[rows]
+            fees = np.frombuffer(registry.fee, dtype=np.float64)[rows]
+            input_reserves = np.where(asset_2_in, reserve_2, reserve_1)
+            output_reserves = np.where(asset_2_in, reserve_1, reserve_2)
+            
+            # Same constant product math as the scalar path, evaluated elementwise
+            expected_output, fee_amount, price_impact = constant_product_output(
+                amounts, input_reserves, output_reserves, fees
+            )
+            
+            return {
+                'expected_output': expected_output,
+                'fee_amount': fee_amount,
+                'price_impact': price_impact,
+                'minimum_received': expected_output * (1 - slippage)
+            }
+        
+        def _rows(self, pool_ids):
+            """Registry rows for an array of pool ids (row indices pass through)"""
+            rows = np.asarray(pool_ids)
+            if rows.dtype.kind not in 'iu':
+                rows = np.fromiter((self.registry.rows[pool_id] for pool_id in rows), dtype=np.intp, count=rows.size)
+            return rows
+        
         def calculate_liquidity_provision(self, pool_id, asset_1_amount, asset_2_amount=None):
             """Calculate LP tokens for liquidity provision"""
-            if pool_id not in self.tinyman_pools:
+            pool = self.resolve_pool(pool_id)
+            if pool is None:
                 return None
             
-            pool = self.tinyman_pools[pool_id]
-            current_ratio = pool['reserve_1'] / pool['reserve_2']
+            current_ratio = pool.reserve_1 / pool.reserve_2
             
             # If only one asset amount provided, calculate the other
             if asset_2_amount is None:
@@ -132,24 +252,23 @@ def connect_tinyman_contract():
             
             # Calculate LP tokens (simplified)
             total_lp_supply = 1000000  # Mock total LP supply
-            lp_tokens_minted = (asset_1_amount / pool['reserve_1']) * total_lp_supply
+            lp_tokens_minted = (asset_1_amount / pool.reserve_1) * total_lp_supply
             
             return {
-                'pool_id': pool_id,
+                'pool_id': pool.pool_id,
                 'asset_1_amount': asset_1_amount,
                 'asset_2_amount': asset_2_amount,
                 'lp_tokens_received': lp_tokens_minted,
                 'pool_share': (lp_tokens_minted / total_lp_supply) * 100,
-                'estimated_apr': pool['apr'],
-                'daily_yield': (pool['apr'] / 365) * lp_tokens_minted
+                'estimated_apr': pool.apr,
+                'daily_yield': (pool.apr / 365) * lp_tokens_minted
             }
         
         def calculate_impermanent_loss(self, pool_id, initial_ratio, current_ratio):
             """Calculate impermanent loss for LP position"""
-            # Impermanent Loss = 2 * sqrt(ratio) / (1 + ratio) - 1
+            # Impermanent Loss = 1 - 2 * sqrt(ratio) / (1 + ratio)
             ratio_change = current_ratio / initial_ratio
-            il_multiplier = 2 * (ratio_change ** 0.5) / (1 + ratio_change) - 1
-            il_percentage = abs(il_multiplier) * 100
+            il_percentage = impermanent_loss(ratio_change) * 100
             
             return {
                 'pool_id': pool_id,
@@ -161,38 +280,70 @@ def connect_tinyman_contract():
                 'risk_level': 'Low' if il_percentage < 2 else 'Medium' if il_percentage < 5 else 'High'
             }
         
-        def find_optimal_pools(self, investment_amount, risk_tolerance='medium'):
+        def impermanent_loss_surface(self, initial_ratios, current_ratios, pool_ids=None):
+            """
+            Vectorized calculate_impermanent_loss for many positions at once.
+            
+            initial_ratios holds one entry per position (shape (n,)); current_ratios
+            is a grid or time series shared by every position (shape (m,)) or one
+            series per position (shape (n, m)). Returns a dict of (n, m) arrays.
+            With pool_ids, each position's pool APR also gives the days of fees
+            needed to break even with holding.
+            """
+            initial = np.asarray(initial_ratios, dtype=np.float64).reshape(-1, 1)
+            current = np.atleast_1d(np.asarray(current_ratios, dtype=np.float64))
+            ratio_change = current / initial
+            break_even = break_even_fee_return(ratio_change)
+            
+            surface = {
+                'ratio_change': ratio_change,
+                'impermanent_loss_percentage': impermanent_loss(ratio_change) * 100,
+                'break_even_yield_percentage': break_even * 100
+            }
+            if pool_ids is not None:
+                apr = np.frombuffer(self.registry.apr, dtype=np.float64)[self._rows(pool_ids)].reshape(-1, 1)
+                with np.errstate(divide='ignore'):
+                    surface['break_even_days'] = np.where(apr > 0, break_even * 365 / apr, np.inf)
+            return surface
+        
+        def submit_lp_simulation(self, pool_id, days=30, paths=10000, seed=None, **overrides):
+            """
+            Start a Monte Carlo simulation of an LP position in a pool.
+            
+            Returns a Future of the outcome distribution (LP return, hold
+            return, LP vs. hold, fee return, impermanent loss) so request
+            threads can hand it off instead of blocking. overrides go to
+            LPSimulationParams (volatility, drift, steps_per_day, ...).
+            """
+            pool = self.resolve_pool(pool_id)
+            if pool is None:
+                raise KeyError(f"Unknown Tinyman pool: {pool_id}")
+            params = LPSimulationParams.from_pool(
+                pool, days=days, paths=paths, seed=seed, **overrides
+            )
+            return self.lp_simulator.submit(params)
+        
+        def simulate_lp_position(self, pool_id, days=30, paths=10000, seed=None, **overrides):
+            """Blocking version of submit_lp_simulation"""
+            return self.submit_lp_simulation(pool_id, days, paths, seed, **overrides).result()
+        
+        def find_optimal_pools(self, investment_amount, risk_tolerance='medium', limit=3):
             """Find optimal pools based on investment criteria"""
             optimal_pools = []
             
-            for pool_id, pool in self.tinyman_pools.items():
-                # Calculate risk score
-                liquidity_score = min(pool['total_liquidity'] / 1000000, 1)  # Max score at $1M+
-                yield_score = pool['apr'] / 0.25  # Max score at 25% APR
-                volume_score = min(pool['volume_24h'] / pool['total_liquidity'], 1)  # Liquidity utilization
-                
-                overall_score = (liquidity_score + yield_score + volume_score) / 3
-                
-                # Apply risk tolerance filter
-                risk_filters = {
-                    'low': lambda p: p['total_liquidity'] > 1000000,
-                    'medium': lambda p: p['total_liquidity'] > 500000,
-                    'high': lambda p: p['total_liquidity'] > 100000
-                }
-                
-                if risk_filters[risk_tolerance](pool):
-                    optimal_pools.append({
-                        'pool_id': pool_id,
-                        'assets': f"{pool['asset_1']}/{pool['asset_2']}",
-                        'apr': pool['apr'],
-                        'liquidity': pool['total_liquidity'],
-                        'score': overall_score,
-                        'recommended_allocation': min(investment_amount * 0.4, pool['total_liquidity'] * 0.1)
-                    })
-            
-            # Sort by score
-            optimal_pools.sort(key=lambda x: x['score'], reverse=True)
-            return optimal_pools[:3]  # Top 3 pools
+            # Risk tolerance filter and score ordering are maintained by the index
+            for pool_id, score in self.score_index.top(risk_tolerance, limit):
+                pool = self.tinyman_pools[pool_id]
+                optimal_pools.append({
+                    'pool_id': pool_id,
+                    'assets': f"{pool.asset_1}/{pool.asset_2}",
+                    'apr': pool.apr,
+                    'liquidity': pool.total_liquidity,
+                    'score': score,
+                    'recommended_allocation': min(investment_amount * 0.4, pool.total_liquidity * 0.1)
+                })
+            
+            return optimal_pools
         
         def execute_tinyman_strategy(self, strategy_type, parameters):
             """Execute advanced Tinyman trading strategies"""
@@ -203,10 +354,26 @@ def connect_tinyman_contract():
                 'high_yield_focus': self._high_yield_strategy
             }
             
-            if strategy_type in strategies:
-                return strategies[strategy_type](parameters)
-            else:
+            if strategy_type not in strategies:
                 return {'error': 'Unknown strategy type'}
+            
+            cache_key = (
+                strategy_type,
+                normalize_params(parameters, STRATEGY_DEFAULTS),
+                self.registry.version
+            )
+            # Results are cached pickled and rebuilt per call, so editing a returned
+            # dict can't change what later hits see (and unpickling is far cheaper
+            # than deepcopy for the thousands of arbitrage opportunities at 100k pools)
+            hit, blob = self.strategy_cache.get(cache_key)
+            if not hit:
+                blob = pickle.dumps(strategies[strategy_type](parameters), pickle.HIGHEST_PROTOCOL)
+                self.strategy_cache.put(cache_key, blob)
+            return pickle.loads(blob)
+        
+        def strategy_cache_stats(self):
+            """Hit/miss counters for the strategy result cache"""
+            return self.strategy_cache.stats()
         
         def _yield_farming_strategy(self, params):
             """Optimize for maximum yield farming returns"""
@@ -226,15 +393,16 @@ def connect_tinyman_contract():
             """Find arbitrage opportunities across pools"""
             opportunities = []
             
-            # Mock arbitrage opportunities
-            opportunities.append({
-                'type': 'cross_pool_arbitrage',
-                'buy_pool': 'ALGO_USDC',
-                'sell_pool': 'ALGO_USDT',
-                'profit_potential': 0.0085,  # 0.85%
-                'max_size': 25000,
-                'execution_time': '< 30 seconds'
-            })
+            for cycle in self.arbitrage.opportunities(params.get('limit')):
+                opportunities.append({
+                    'type': 'cross_pool_arbitrage' if len(cycle['hops']) == 2 else 'triangular_arbitrage',
+                    'cycle': cycle['cycle'],
+                    'buy_pool': cycle['hops'][0]['pool'],
+                    'sell_pool': cycle['hops'][-1]['pool'],
+                    'profit_potential': cycle['rate_of_return'],
+                    'max_size': cycle['max_size'],
+                    'expected_profit': cycle['expected_profit']
+                })
             
             return {
                 'strategy': 'arbitrage_hunting',
@@ -266,7 +434,7 @@ def connect_tinyman_contract():
             # Sort pools by APR
             high_yield_pools = sorted(
                 self.tinyman_pools.items(),
-                key=lambda x: x[1]['apr'],
+                key=lambda x: x[1].apr,
                 reverse=True
             )[:2]  # Top 2 highest yield
             
@@ -276,15 +444,17 @@ def connect_tinyman_contract():
                 'top_yield_pools': [
                     {
                         'pool_id': pool_id,
-                        'assets': f"{pool['asset_1']}/{pool['asset_2']}",
-                        'apr': pool['apr'],
+                        'assets': f"{pool.asset_1}/{pool.asset_2}",
+                        'apr': pool.apr,
                         'allocation': investment / 2
                     }
                     for pool_id, pool in high_yield_pools
                 ],
-                'average_apy': sum(pool[1]['apr'] for pool in high_yield_pools) / len(high_yield_pools),
+                'average_apy': sum(pool[1].apr for pool in high_yield_pools) / len(high_yield_pools),
                 'risk_warning': 'High yield pools may have higher impermanent loss risk'
             }
+    
+    return TinymanConnector(registry)
 
 def main():
     """Demo of Tinyman integration contract"""
@@ -298,9 +468,9 @@ def main():
     for pool_id in ['ALGO_USDC', 'ALGO_AKTA']:
         info = tinyman.get_pool_info(pool_id)
         print(f"\n   {info['assets']} Pool:")
-        print(f"      Liquidity: ${info['total_liquidity']:,}")
+        print(f"      Liquidity: ${info['total_liquidity']:,.0f}")
         print(f"      APR: {info['annual_percentage_rate']*100:.1f}%")
-        print(f"      24h Volume: ${info['daily_volume']:,}")
+        print(f"      24h Volume: ${info['daily_volume']:,.0f}")
         print(f"      Utilization: {info['liquidity_utilization']*100:.1f}%")
     
     # Demo: Swap calculation
@@ -310,6 +480,14 @@ def main():
     print(f"   Fee: {swap_result['fee_amount']:.2f} USDC")
     print(f"   Price Impact: {swap_result['price_impact']:.3f}%")
     print(f"   Minimum Received: {swap_result['minimum_received']:.2f} USDC")
+    print(f"   On-chain min_output: {swap_result['minimum_received_micro']:,} micro-USDC")
+    
+    # Demo: Batch quoting
+    print("\n📦 Batch Quote (ALGO → USDC at several sizes):")
+    sizes = [100, 1000, 10000, 100000]
+    batch = tinyman.calculate_swap_outputs(['ALGO_USDC'] * len(sizes), [0] * len(sizes), sizes)
+    for size, output, impact in zip(sizes, batch['expected_output'], batch['price_impact']):
+        print(f"   {size:>7,} ALGO → {output:,.2f} USDC (impact {impact:.3f}%)")
     
     # Demo: Liquidity provision
     print("\n💧 Liquidity Provision (5000 ALGO):")
@@ -319,6 +497,26 @@ def main():
     print(f"   Pool Share: {lp_result['pool_share']:.4f}%")
     print(f"   Daily Yield: {lp_result['daily_yield']:.2f} LP tokens")
     
+    # Demo: Impermanent loss surface
+    print("\n📉 Impermanent Loss Surface (price moves vs. pools):")
+    pool_ids = ['ALGO_USDC', 'ALGO_AKTA']
+    moves = [0.5, 0.8, 1.25, 2.0]
+    surface = tinyman.impermanent_loss_surface([1.0] * len(pool_ids), moves, pool_ids)
+    print("   Price move:   " + "".join(f"{move:>9.2f}x" for move in moves))
+    for i, pool_id in enumerate(pool_ids):
+        print(f"   {pool_id:<13}" + "".join(f"{il:>9.2f}%" for il in surface['impermanent_loss_percentage'][i]))
+        print(f"   {'break-even':<13}" + "".join(f"{days:>9.0f}d" for days in surface['break_even_days'][i]))
+    
+    # Demo: Monte Carlo LP simulation
+    print("\n🎲 LP Simulation (ALGO_USDC, 30 days, 20,000 paths):")
+    simulation = tinyman.simulate_lp_position('ALGO_USDC', days=30, paths=20000, seed=7)
+    print(f"   Median LP return: {simulation['lp_return']['p50']*100:+.2f}%")
+    print(f"   Median hold return: {simulation['hold_return']['p50']*100:+.2f}%")
+    print(f"   LP vs hold (5th-95th pct): {simulation['lp_vs_hold']['p5']*100:+.2f}% to "
+          f"{simulation['lp_vs_hold']['p95']*100:+.2f}%")
+    print(f"   Mean fee return: {simulation['fee_return']['mean']*100:.2f}%")
+    print(f"   P(LP beats holding): {simulation['probability_lp_beats_hold']*100:.0f}%")
+    
     # Demo: Strategy execution
     print("\n🎯 Yield Farming Strategy ($10,000):")
     strategy = tinyman.execute_tinyman_strategy('yield_farming', {'investment_amount': 10000})
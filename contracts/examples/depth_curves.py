@@ -0,0 +1,210 @@
+"""
+Depth Curves
+============
+Precomputed market depth for every pool and every aggregated pair in the
+pool registry. Answers the Aether AI agent's "how much can I swap before the
+price moves by X%?" without re-solving anything per request.
+
+Features:
+- Closed-form constant product depth: swapping x into a pool moves its
+  marginal price (after fees) by 1 - (R / (R + x))^2
+- Aggregated pair depth across venues with optimal splitting: every pool
+  is filled down to a common marginal price
+- Standard levels (0.1%, 0.5%, 1%, 2%, 5%) precomputed; any other level,
+  and the inverse (price move caused by an amount), answered in O(log n)
+- Incremental updates: only pairs touching changed pools are rebuilt
+"""
+
+import math
+from bisect import bisect_right
+from collections import defaultdict
+from functools import lru_cache
+
+from amm_math import spot_rate
+
+DEPTH_LEVELS = (0.001, 0.005, 0.01, 0.02, 0.05)
+
+
+@lru_cache(maxsize=None)
+def _level_factors(levels):
+    """(level, 1 / sqrt(1 - level) - 1): single pool depth per unit of input reserve"""
+    return tuple((level, 1 / math.sqrt(1 - level) - 1) for level in levels)
+
+
+class PairDepth:
+    """
+    Depth of one directed pair over one or more pools.
+
+    Pools are ordered by spot price (best first). Filling pools 0..k-1 down
+    to a marginal price t needs sum(R_i * (sqrt(P_i / t) - 1)), i.e.
+    prefix_a[k] / sqrt(t) - prefix_b[k] with prefix sums of R_i * sqrt(P_i)
+    and R_i, so every query is a bisect plus a closed form.
+    """
+
+    __slots__ = ('pools', 'prices', 'ascending_prices', 'prefix_a', 'prefix_b', 'breakpoints',
+                 'levels', '_curve')
+
+    def __init__(self, legs, levels=DEPTH_LEVELS):
+        # legs: (pool_id, spot price after fees, input reserve)
+        legs = [leg for leg in legs if leg[1] > 0 and leg[2] > 0]
+        if len(legs) > 1:
+            legs.sort(key=lambda leg: -leg[1])
+        self.pools = tuple(pool_id for pool_id, _, _ in legs)
+        self.prices = tuple(price for _, price, _ in legs)
+        self.ascending_prices = self.prices[::-1]
+        self.levels = levels
+        self._curve = None
+
+        prefix_a, prefix_b = [0.0], [0.0]
+        for _, price, reserve in legs:
+            prefix_a.append(prefix_a[-1] + reserve * math.sqrt(price))
+            prefix_b.append(prefix_b[-1] + reserve)
+        # Tuples of floats are untracked by the garbage collector, which matters at 100k+ pools
+        self.prefix_a, self.prefix_b = tuple(prefix_a), tuple(prefix_b)
+
+        # Input needed before pool k starts trading (marginal price reaches its spot)
+        self.breakpoints = (0.0,) + tuple(
+            prefix_a[k] / math.sqrt(self.prices[k]) - prefix_b[k]
+            for k in range(1, len(legs))
+        )
+
+    def __bool__(self):
+        return bool(self.pools)
+
+    @property
+    def best_price(self):
+        return self.prices[0] if self.prices else 0.0
+
+    @property
+    def curve(self):
+        """((level, input amount), ...) at the configured levels, evaluated once per rebuild"""
+        if self._curve is None:
+            if len(self.pools) == 1:
+                # One pool: amount = R * (1 / sqrt(1 - level) - 1)
+                reserve = self.prefix_b[1]
+                self._curve = tuple((level, reserve * factor) for level, factor in _level_factors(self.levels))
+            else:
+                self._curve = tuple((level, self.amount_for_impact(level)) for level in self.levels)
+        return self._curve
+
+    def amount_for_impact(self, impact):
+        """Input that moves the best marginal price down by `impact` (a fraction)"""
+        if not self.prices or impact <= 0:
+            return 0.0
+        if impact >= 1:
+            return math.inf
+        target = self.prices[0] * (1 - impact)
+        active = len(self.prices) - bisect_right(self.ascending_prices, target)
+        return self.prefix_a[active] / math.sqrt(target) - self.prefix_b[active]
+
+    def impact_for_amount(self, amount):
+        """Fractional move of the marginal price after an optimally split input"""
+        if not self.prices or amount <= 0:
+            return 0.0
+        active = bisect_right(self.breakpoints, amount)
+        target = (self.prefix_a[active] / (amount + self.prefix_b[active])) ** 2
+        return 1 - target / self.prices[0]
+
+    def allocation(self, amount):
+        """{pool_id: input} for the split that leaves every active pool at the same marginal price"""
+        if not self.prices or amount <= 0:
+            return {}
+        active = bisect_right(self.breakpoints, amount)
+        root_target = self.prefix_a[active] / (amount + self.prefix_b[active])
+        return {
+            pool_id: (self.prefix_a[i + 1] - self.prefix_a[i]) / root_target - (self.prefix_b[i + 1] - self.prefix_b[i])
+            for i, pool_id in enumerate(self.pools[:active])
+        }
+
+
+class DepthIndex:
+    """Depth curves per pool direction and per aggregated pair, kept in sync with a PoolRegistry"""
+
+    def __init__(self, registry, venues=None, levels=DEPTH_LEVELS):
+        self.registry = registry
+        self.venues = None if venues is None else set(venues)
+        self.levels = tuple(levels)
+        self.pool_depth = {}                    # (pool_id, asset_in_id) -> PairDepth
+        self.pair_depth = {}                    # (asset_in_id, asset_out_id) -> PairDepth
+        self.rebuild()
+        registry.subscribe(self._on_pools_changed)
+
+    def _included(self, row):
+        return self.venues is None or self.registry.venues[row] in self.venues
+
+    def rebuild(self):
+        """Recompute every curve from the registry in one pass over its columns"""
+        self.pool_depth.clear()
+        self.pair_depth.clear()
+        legs_by_direction = defaultdict(list)
+        for row in range(len(self.registry)):
+            if self._included(row):
+                for direction, leg in self._legs(row):
+                    legs_by_direction[direction].append(leg)
+        self._store(legs_by_direction)
+
+    def _legs(self, row):
+        """((asset_in, asset_out), leg) for both swap directions of a pool"""
+        registry = self.registry
+        pool_id = registry.pool_ids[row]
+        asset_1, asset_2 = registry.asset_1_ids[row], registry.asset_2_ids[row]
+        reserve_1, reserve_2, fee = registry.reserve_1[row], registry.reserve_2[row], registry.fee[row]
+        yield (asset_1, asset_2), (pool_id, spot_rate(reserve_1, reserve_2, fee) if reserve_1 else 0.0, reserve_1)
+        yield (asset_2, asset_1), (pool_id, spot_rate(reserve_2, reserve_1, fee) if reserve_2 else 0.0, reserve_2)
+
+    def _rebuild_pair(self, pair):
+        legs_by_direction = defaultdict(list)
+        for row in self.registry.pair_pools.get(pair, ()):
+            if not self._included(row):
+                continue
+            for direction, leg in self._legs(row):
+                legs_by_direction[direction].append(leg)
+        self._store(legs_by_direction)
+
+    def _store(self, legs_by_direction):
+        for direction, legs in legs_by_direction.items():
+            depth = self.pair_depth[direction] = PairDepth(legs, self.levels)
+            if len(legs) == 1:
+                # Most long-tail pairs have a single pool, whose curve is the pair curve
+                self.pool_depth[(legs[0][0], direction[0])] = depth
+            else:
+                for leg in legs:
+                    self.pool_depth[(leg[0], direction[0])] = PairDepth([leg], self.levels)
+
+    def _on_pools_changed(self, pool_ids):
+        """Rebuild only the pairs traded by changed pools"""
+        registry = self.registry
+        pairs = set()
+        for pool_id in pool_ids:
+            row = registry.rows.get(pool_id)
+            if row is not None and self._included(row):
+                pairs.add(registry.pair_key(registry.asset_1_ids[row], registry.asset_2_ids[row]))
+        for pair in pairs:
+            self._rebuild_pair(pair)
+
+    def _asset_id(self, token):
+        """Asset id for an id, symbol or alias; None for unknown tokens instead of KeyError"""
+        return token if isinstance(token, int) else self.registry.asset_ids.get(token)
+
+    def pair(self, token_in, token_out):
+        """PairDepth aggregated over every pool trading token_in for token_out, or None"""
+        return self.pair_depth.get((self._asset_id(token_in), self._asset_id(token_out)))
+
+    def pool(self, pool_id, token_in):
+        """PairDepth of a single pool when token_in is sold into it, or None"""
+        return self.pool_depth.get((pool_id, self._asset_id(token_in)))
+
+    def curve(self, token_in, token_out, pool_id=None):
+        """Precomputed [(price move, input amount)] at the standard levels"""
+        depth = self.pool(pool_id, token_in) if pool_id is not None else self.pair(token_in, token_out)
+        return list(depth.curve) if depth else []
+
+    def max_input(self, token_in, token_out, max_impact, pool_id=None):
+        """Largest input that keeps the marginal price move within max_impact"""
+        depth = self.pool(pool_id, token_in) if pool_id is not None else self.pair(token_in, token_out)
+        return depth.amount_for_impact(max_impact) if depth else 0.0
+
+    def impact(self, token_in, token_out, amount, pool_id=None):
+        """Marginal price move caused by swapping amount (split optimally across pools)"""
+        depth = self.pool(pool_id, token_in) if pool_id is not None else self.pair(token_in, token_out)
+        return depth.impact_for_amount(amount) if depth else None
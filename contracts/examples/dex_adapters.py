@@ -0,0 +1,246 @@
+"""
+DEX Adapters
+============
+Async quote sources for the Aether AI "/openDEX" router, one adapter per
+venue, queried concurrently so a slow DEX never holds up the others.
+
+Features:
+- DEXAdapter interface: async quote(token_in, token_out, amount)
+- Tinyman, AlgoFi and Pact adapters quoting from the shared pool registry
+- StubAdapter wrapper injecting latency, slow tails and failures for testing
+- AsyncQuoteRouter: concurrent fan-out with per-adapter timeouts, hedged
+  requests after the adapter's p95 latency, and partial results when some
+  venues time out or fail
+"""
+
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from amm_math import constant_product_output
+
+DEFAULT_TIMEOUT = 0.5           # seconds per adapter
+DEFAULT_HEDGE_AFTER = 0.1       # seconds before a duplicate request, until p95 is known
+MIN_LATENCY_SAMPLES = 20        # samples needed before hedging on the observed p95
+
+
+class DEXAdapter:
+    """Async quote source for one DEX; subclasses implement quote()"""
+
+    dex_id = None
+    name = None
+    timeout = None              # None uses the router's timeout
+
+    async def quote(self, token_in, token_out, amount):
+        """Best direct quote for swapping amount of token_in, or None if the pair is not listed"""
+        raise NotImplementedError
+
+
+class RegistryAdapter(DEXAdapter):
+    """
+    Quotes a venue's pools from the shared PoolRegistry.
+
+    Stands in for the venue's own quote API: a live adapter would await an
+    HTTP or algod call here and return the same quote shape.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    async def quote(self, token_in, token_out, amount):
+        registry = self.registry
+        try:
+            asset_in = registry.resolve_asset(token_in)
+            rows = registry.pools_for_pair(asset_in, token_out)
+        except KeyError:
+            return None     # an unknown asset is simply not listed here
+        best = None
+        for row in rows:
+            if registry.venues[row] != self.dex_id:
+                continue
+            if registry.asset_1_ids[row] == asset_in:
+                reserve_in, reserve_out = registry.reserve_1[row], registry.reserve_2[row]
+            else:
+                reserve_in, reserve_out = registry.reserve_2[row], registry.reserve_1[row]
+            output, fee_amount, price_impact = constant_product_output(
+                amount, reserve_in, reserve_out, registry.fee[row]
+            )
+            if best is None or output > best['expected_output']:
+                best = {
+                    'dex': self.dex_id,
+                    'dex_name': self.name,
+                    'pool': registry.pool_ids[row],
+                    'input_amount': amount,
+                    'expected_output': output,
+                    'fee': registry.fee[row],
+                    'fee_amount': fee_amount,
+                    'price_impact': price_impact
+                }
+        return best
+
+
+class TinymanAdapter(RegistryAdapter):
+    dex_id = 'tinyman'
+    name = 'Tinyman'
+
+
+class AlgoFiAdapter(RegistryAdapter):
+    dex_id = 'algofi'
+    name = 'AlgoFi'
+
+
+class PactAdapter(RegistryAdapter):
+    dex_id = 'pact'
+    name = 'Pact'
+
+
+ADAPTERS = {adapter.dex_id: adapter for adapter in (TinymanAdapter, AlgoFiAdapter, PactAdapter)}
+
+
+def venue_adapters(registry, venues=None):
+    """One registry-backed adapter per supported venue"""
+    return [ADAPTERS[venue](registry) for venue in (venues or ADAPTERS) if venue in ADAPTERS]
+
+
+class StubAdapter(DEXAdapter):
+    """
+    Wraps an adapter and injects latency and failures.
+
+    Every call waits `latency` seconds, or `tail_latency` with probability
+    `tail_probability` (the slow requests hedging is meant to cut), and
+    fails with probability `failure_rate`.
+    """
+
+    def __init__(self, adapter, latency=0.02, tail_latency=None, tail_probability=0.0,
+                 failure_rate=0.0, timeout=None, seed=None):
+        self.adapter = adapter
+        self.dex_id = adapter.dex_id
+        self.name = adapter.name
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_probability = tail_probability
+        self.failure_rate = failure_rate
+        self.timeout = timeout if timeout is not None else adapter.timeout
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    async def quote(self, token_in, token_out, amount):
+        self.calls += 1
+        slow = self.tail_latency is not None and self._rng.random() < self.tail_probability
+        await asyncio.sleep(self.tail_latency if slow else self.latency)
+        if self._rng.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} quote failed (injected)")
+        return await self.adapter.quote(token_in, token_out, amount)
+
+
+class AsyncQuoteRouter:
+    """Fans a quote request out to every adapter concurrently"""
+
+    def __init__(self, adapters, timeout=DEFAULT_TIMEOUT, hedge_after=DEFAULT_HEDGE_AFTER):
+        self.adapters = list(adapters)
+        self.timeout = timeout
+        self.hedge_after = hedge_after          # None disables hedging
+        self.latencies = defaultdict(lambda: deque(maxlen=200))     # dex id -> recent seconds
+
+    def _hedge_delay(self, adapter):
+        """Observed p95 latency of an adapter, or the default until enough samples exist"""
+        samples = self.latencies[adapter.dex_id]
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.hedge_after
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    async def _query(self, adapter, token_in, token_out, amount):
+        """
+        Quote from one adapter within its timeout; returns (quote, requests sent).
+
+        If no answer arrives within the hedge delay, or the first request
+        fails, one duplicate request is sent and the first success wins.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + (adapter.timeout or self.timeout)
+        hedge_at = None if self.hedge_after is None else started + self._hedge_delay(adapter)
+        tasks = {asyncio.ensure_future(adapter.quote(token_in, token_out, amount))}
+        sent, error = 1, None
+        try:
+            while True:
+                now = loop.time()
+                if hedge_at is not None and (now >= hedge_at or not tasks):
+                    hedge_at = None
+                    tasks.add(asyncio.ensure_future(adapter.quote(token_in, token_out, amount)))
+                    sent += 1
+                if not tasks:
+                    raise error
+                if now >= deadline:
+                    raise asyncio.TimeoutError
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, tasks = await asyncio.wait(tasks, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.latencies[adapter.dex_id].append(loop.time() - started)
+                        return task.result(), sent
+                    error = task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _collect(self, adapter, token_in, token_out, amount):
+        """(dex id, quote, requests sent, error) without raising"""
+        try:
+            quote, sent = await self._query(adapter, token_in, token_out, amount)
+            return adapter.dex_id, quote, sent, None
+        except asyncio.TimeoutError:
+            return adapter.dex_id, None, None, 'timeout'
+        except Exception as error:
+            return adapter.dex_id, None, None, str(error) or type(error).__name__
+
+    async def quote_all(self, token_in, token_out, amount):
+        """Quotes from every adapter, best first, plus venues without the pair and those that timed out or failed"""
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(
+            self._collect(adapter, token_in, token_out, amount) for adapter in self.adapters
+        ))
+
+        quotes, errors, hedged, unlisted = [], {}, [], []
+        for dex_id, quote, sent, error in outcomes:
+            if error is not None:
+                errors[dex_id] = error
+                continue
+            if sent > 1:
+                hedged.append(dex_id)
+            if quote is None:
+                unlisted.append(dex_id)
+            else:
+                quotes.append(quote)
+        quotes.sort(key=lambda quote: quote['expected_output'], reverse=True)
+
+        return {
+            'pair': f"{token_in}/{token_out}",
+            'input_amount': amount,
+            'best': quotes[0] if quotes else None,
+            'quotes': quotes,
+            'errors': errors,
+            'unlisted': unlisted,
+            'partial': bool(errors),
+            'hedged': hedged,
+            'elapsed_ms': (time.perf_counter() - started) * 1000
+        }
+
+    def quote_all_sync(self, token_in, token_out, amount):
+        """
+        quote_all for synchronous callers.
+
+        Meant for request threads without an event loop. Code already running
+        inside a loop should await quote_all instead: asyncio.run can't nest,
+        so here the fan-out runs on a helper thread's loop and blocks the
+        caller's loop until it finishes.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.quote_all(token_in, token_out, amount))
+        with ThreadPoolExecutor(max_workers=1) as helper:
+            return helper.submit(asyncio.run, self.quote_all(token_in, token_out, amount)).result()
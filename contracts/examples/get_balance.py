@@ -29,8 +29,8 @@ def get_balance_contract():
     
     # Balance validation
     def validate_balance_request():
+        # The approval program only runs for application calls, so TypeEnum needs no check
         return And(
-            Txn.type_enum() == TxnType.ApplicationCall,
             App.optedIn(Txn.sender(), Txn.application_id()),
             Global.latest_timestamp() > App.localGet(Txn.sender(), last_update_key)
         )
@@ -52,7 +52,7 @@ def get_balance_contract():
          ])],
         
         # Wallet opt-in for balance tracking
-        [Txn.on_completion() == OnCall.OptIn,
+        [Txn.on_completion() == OnComplete.OptIn,
          Seq([
              App.localPut(Txn.sender(), algo_balance_key, Int(0)),
              App.localPut(Txn.sender(), last_update_key, Int(0)),
@@ -84,6 +84,7 @@ def get_balance_contract():
              ),
              
              # Calculate and update portfolio value
+             # (re-decoding arg 1 is txna + btoi; a scratch slot would add a store and two loads)
              App.localPut(
                  Txn.sender(),
                  portfolio_value_key,
@@ -153,7 +154,7 @@ def get_balance_contract():
          ])],
         
         # Default
-        [Return(Int(0))]
+        [Int(1), Return(Int(0))]
     )
     
     return program
@@ -165,16 +166,12 @@ def clear_state_program():
     return Return(Int(1))
 
 if __name__ == "__main__":
-    # Compile the contract
-    approval_teal = compileTeal(approval_program(), Mode.Application, version=8)
-    clear_teal = compileTeal(clear_state_program(), Mode.Application, version=8)
+    # Compile through the cached build pipeline (outputs go to contracts/build/)
+    from build_contracts import BUILD_DIR, build_contracts
     
-    # Save to files
-    with open("get_balance_approval.teal", "w") as f:
-        f.write(approval_teal)
+    status = build_contracts(['get_balance'])['get_balance']
+    if status.startswith('error'):
+        raise SystemExit(f"❌ Get Balance contract failed to compile: {status}")
     
-    with open("get_balance_clear.teal", "w") as f:
-        f.write(clear_teal)
-    
-    print("✅ Get Balance contract compiled successfully!")
+    print(f"✅ Get Balance contract {status} → {BUILD_DIR}")
     print("📊 Features: Balance tracking, Portfolio analytics, Yield calculation")
@@ -0,0 +1,198 @@
+"""
+LP Simulator
+============
+Monte Carlo outcomes of a constant product liquidity position for the
+Aether AI "/connectTinyman" analytics: how an LP deposit is expected to do
+against simply holding the two assets.
+
+Features:
+- Geometric Brownian motion price paths, with arbitrage keeping the pool on
+  the external price (reserves follow x = L * sqrt(p), y = L / sqrt(p))
+- Fees from noise volume (pool turnover) and arbitrage flow, reinvested
+  into the pool as growth of its liquidity L
+- Whole blocks of paths evaluated as NumPy arrays, sharded across a process
+  pool with independent random streams
+- Futures API so request threads can submit simulations without blocking
+
+Returns are relative to the deposit value in asset_1 units at the start.
+"""
+
+import math
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+from amm_math import impermanent_loss
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_VOLATILITY = 0.8        # annualised, typical for ALGO pairs
+VOLUME_DISPERSION = 0.5         # lognormal sigma of per-step noise volume
+
+
+class LPSimulationParams:
+    """Inputs of one simulation; plain attributes so it pickles cheaply to workers"""
+
+    __slots__ = ('fee', 'daily_turnover', 'volatility', 'drift', 'days', 'steps_per_day',
+                 'paths', 'seed')
+
+    def __init__(self, fee, daily_turnover, volatility=DEFAULT_VOLATILITY, drift=0.0, days=30,
+                 steps_per_day=24, paths=10000, seed=None):
+        # Zero paths or steps would leave submit() with no shards and a Future that never resolves
+        for name, value in (('days', days), ('steps_per_day', steps_per_day), ('paths', paths)):
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                raise ValueError(f"{name} must be a positive integer, got {value!r}")
+        if not 0 <= fee < 1:
+            raise ValueError(f"fee must be in [0, 1), got {fee!r}")
+        if not (daily_turnover >= 0 and volatility >= 0):
+            raise ValueError("daily_turnover and volatility must be non-negative")
+        self.fee = fee                          # fraction of traded volume kept by LPs
+        self.daily_turnover = daily_turnover    # noise volume per day / pool liquidity
+        self.volatility = volatility            # annualised volatility of the pool price
+        self.drift = drift                      # annualised drift of the pool price
+        self.days = days
+        self.steps_per_day = steps_per_day
+        self.paths = paths
+        self.seed = seed
+
+    @classmethod
+    def from_pool(cls, pool, **overrides):
+        """Parameters for a registry PoolRecord: fee and turnover from its 24h volume"""
+        turnover = pool.volume_24h / pool.total_liquidity if pool.total_liquidity else 0.0
+        return cls(pool.fee, turnover, **overrides)
+
+
+def simulate_block(params, paths, seed_sequence, chunk=2000):
+    """
+    Simulate `paths` price paths and return per-path outcome arrays.
+
+    Paths are generated chunk by chunk so memory stays at chunk x steps.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    steps = params.days * params.steps_per_day
+    dt = 1 / (365 * params.steps_per_day)
+    sigma = params.volatility * math.sqrt(dt)
+    mu = (params.drift - params.volatility ** 2 / 2) * dt
+    turnover_step = params.daily_turnover / params.steps_per_day
+    volume_mu = -VOLUME_DISPERSION ** 2 / 2     # keeps mean noise volume at turnover_step
+
+    price_ratio = np.empty(paths)
+    liquidity_growth = np.empty(paths)
+    for start in range(0, paths, chunk):
+        size = min(chunk, paths - start)
+        log_price = np.cumsum(mu + sigma * rng.standard_normal((size, steps)), axis=1)
+        sqrt_price = np.exp(log_price / 2)
+        previous = np.concatenate([np.ones((size, 1)), sqrt_price[:, :-1]], axis=1)
+
+        # Both volume sources as a fraction of pool value (2 * L * sqrt(p)), so growth is size free:
+        # noise volume = turnover * value, arbitrage volume in asset_1 = L * |d sqrt(p)|
+        noise = turnover_step * rng.lognormal(volume_mu, VOLUME_DISPERSION, (size, steps))
+        arbitrage = np.abs(sqrt_price - previous) / (2 * sqrt_price)
+        growth = np.log1p(params.fee * (noise + arbitrage)).sum(axis=1)
+
+        price_ratio[start:start + size] = sqrt_price[:, -1] ** 2
+        liquidity_growth[start:start + size] = np.exp(growth)
+
+    lp_value = liquidity_growth * np.sqrt(price_ratio)
+    hold_value = (1 + price_ratio) / 2
+    return {
+        'price_ratio': price_ratio,
+        'lp_return': lp_value - 1,
+        'hold_return': hold_value - 1,
+        'lp_vs_hold': lp_value / hold_value - 1,
+        'fee_return': liquidity_growth - 1,
+        'impermanent_loss': impermanent_loss(price_ratio)
+    }
+
+
+def summarize(outcomes):
+    """Distribution summary of concatenated per-path outcomes"""
+    summary = {'paths': int(outcomes['lp_return'].size)}
+    for name, values in outcomes.items():
+        summary[name] = {
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            **{f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+        }
+    summary['probability_lp_beats_hold'] = float((outcomes['lp_vs_hold'] > 0).mean())
+    return summary
+
+
+def _merge(blocks):
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+class LPSimulator:
+    """Runs simulations on a shared process pool; safe to call from many request threads"""
+
+    def __init__(self, max_workers=None, shard_paths=5000):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shard_paths = shard_paths      # paths per worker task
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def submit(self, params, keep_paths=False):
+        """
+        Start a simulation and return a Future of its summary.
+
+        Shards run in parallel; the returned future resolves once all of them
+        finish (or fails with the first shard error). With keep_paths the
+        result also carries the raw per-path arrays under 'outcomes'.
+        """
+        shards = [
+            min(self.shard_paths, params.paths - start)
+            for start in range(0, params.paths, self.shard_paths)
+        ]
+        if not shards:
+            raise ValueError(f"paths must be positive, got {params.paths!r}")
+        seeds = np.random.SeedSequence(params.seed).spawn(len(shards))
+        result = Future()
+        blocks = [None] * len(shards)
+        remaining = [len(shards)]
+        lock = threading.Lock()
+
+        # Callbacks may fire on the executor's thread or, for finished shards, the caller's
+        def shard_done(index, future):
+            error = future.exception()
+            with lock:
+                if result.done():
+                    return
+                if error is not None:
+                    result.set_exception(error)
+                    return
+                blocks[index] = future.result()
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            outcomes = _merge(blocks)
+            summary = summarize(outcomes)
+            if keep_paths:
+                summary['outcomes'] = outcomes
+            result.set_result(summary)
+
+        for index, (paths, seed) in enumerate(zip(shards, seeds)):
+            future = self._pool().submit(simulate_block, params, paths, seed)
+            future.add_done_callback(lambda f, index=index: shard_done(index, f))
+        return result
+
+    def simulate(self, params, keep_paths=False):
+        """Blocking convenience wrapper around submit"""
+        return self.submit(params, keep_paths).result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def simulate_inline(params):
+    """Single-process simulation, for small runs and environments without worker processes"""
+    return summarize(simulate_block(params, params.paths, np.random.SeedSequence(params.seed)))
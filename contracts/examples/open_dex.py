@@ -7,11 +7,22 @@ Compatible with Aether AI Agent Command: "/openDEX"
 Features:
 - Multi-DEX integration (Tinyman, AlgoFi, Pact)
 - Optimal route finding
-- Liquidity aggregation
+- Concurrent per-DEX quotes with timeouts, hedging and partial results
+- Liquidity aggregation with precomputed depth curves
 - Cross-DEX arbitrage detection
 """
 
-def open_dex_contract():
+import math
+
+from amm_math import constant_product_output, curve_coefficients, curve_output
+from arbitrage import ArbitrageDetector
+from depth_curves import DepthIndex
+from dex_adapters import AsyncQuoteRouter, StubAdapter, venue_adapters
+from order_split import split_order
+from pool_registry import default_registry
+from token_graph import TokenGraph
+
+def open_dex_contract(registry=None):
     """
     Smart contract for unified DEX access and routing
     Integrates with major Algorand DEX platforms
@@ -25,112 +36,270 @@ def open_dex_contract():
     # - Other emerging DEX platforms
     
     class DEXRouter:
-        def __init__(self):
+        def __init__(self, registry=None):
             self.supported_dexes = {
                 'tinyman': {
                     'name': 'Tinyman',
                     'type': 'AMM',
                     'fee': 0.0025,  # 0.25%
-                    'liquidity_pools': ['ALGO/USDC', 'ALGO/USDT', 'ALGO/AKTA'],
                     'features': ['swap', 'add_liquidity', 'remove_liquidity']
                 },
                 'algofi': {
                     'name': 'AlgoFi',
                     'type': 'Lending + DEX',
                     'fee': 0.003,   # 0.30%
-                    'liquidity_pools': ['ALGO/STBL', 'ALGO/BANK'],
                     'features': ['swap', 'lend', 'borrow', 'yield_farm']
                 },
                 'pact': {
                     'name': 'Pact',
                     'type': 'AMM',
                     'fee': 0.002,   # 0.20%
-                    'liquidity_pools': ['ALGO/PACT', 'ALGO/VOTE'],
                     'features': ['swap', 'add_liquidity', 'governance']
                 }
             }
             
-        def find_best_route(self, token_in, token_out, amount):
+            # Pool state lives in the shared registry, also used by TinymanConnector
+            self.registry = registry if registry is not None else default_registry()
+            for dex_id, dex_info in self.supported_dexes.items():
+                dex_info['liquidity_pools'] = [
+                    f"{pool.asset_1}/{pool.asset_2}"
+                    for pool in self.registry.records(self.registry.venue_pools.get(dex_id, []))
+                ]
+            
+            # Token graph is built once; every route query reuses it
+            self.token_graph = TokenGraph.from_registry(self.registry, self.supported_dexes)
+            self.arbitrage = ArbitrageDetector(self.token_graph)
+            self.registry.subscribe(self._on_pools_changed)
+            
+            # Depth curves subscribe themselves and rebuild only the pairs that changed
+            self.depth = DepthIndex(self.registry, self.supported_dexes)
+            
+            # Live per-DEX quotes are fanned out concurrently; one slow venue can't stall the rest
+            self.quote_router = AsyncQuoteRouter(venue_adapters(self.registry, self.supported_dexes))
+            
+        def _on_pools_changed(self, pool_ids):
+            """Reprice graph edges and re-check arbitrage for updated pools; add newly registered ones"""
+            added = False
+            for pool_id in pool_ids:
+                pool = self.registry.pool(pool_id)
+                if pool is None or pool.venue not in self.supported_dexes:
+                    continue
+                if (pool.venue, pool_id) not in self.token_graph.pool_edges:
+                    self.token_graph.add_pool(
+                        pool_id, pool.venue, pool.asset_1, pool.asset_2,
+                        pool.fee, pool.reserve_1, pool.reserve_2
+                    )
+                    self.supported_dexes[pool.venue]['liquidity_pools'].append(f"{pool.asset_1}/{pool.asset_2}")
+                    added = True
+                    continue
+                self.token_graph.update_reserves(pool.venue, pool_id, pool.reserve_1, pool.reserve_2, pool.fee)
+                self.arbitrage.update_pool(pool.venue, pool_id)
+            if added:
+                # New pools create new cycles, so the cycle index is re-enumerated once
+                self.arbitrage.rebuild()
+            
+        def update_pool_reserves(self, pool_id, reserve_1, reserve_2):
+            """Record fresh reserves for a pool; the graph reprices via the registry"""
+            self.registry.update_pool(pool_id, reserve_1=reserve_1, reserve_2=reserve_2)
+        
+        def _token(self, token):
+            """Graph node for a symbol, alias or asset id (unknown tokens pass through)"""
+            return self.registry.symbol(token) or token
+            
+        def quote_path(self, path, amount):
+            """Quote a swap along a path of pool edges using constant product math"""
+            output = amount
+            total_fees = []
+            hop_outputs = []
+            for edge in path:
+                output, fee_amount, _ = constant_product_output(
+                    output, edge.reserve_in, edge.reserve_out, edge.fee
+                )
+                total_fees.append(fee_amount)
+                hop_outputs.append(output)
+            return output, total_fees, hop_outputs
+            
+        def find_best_route(self, token_in, token_out, amount, max_hops=3):
             """Find the most efficient trading route across DEXes"""
             best_route = None
             best_output = 0
+            token_in, token_out = self._token(token_in), self._token(token_out)
             
-            for dex_id, dex_info in self.supported_dexes.items():
-                # Simulate route calculation
-                pair = f"{token_in}/{token_out}"
-                if pair in dex_info['liquidity_pools']:
-                    # Mock calculation - in reality would query DEX contracts
-                    estimated_output = amount * (1 - dex_info['fee'])
-                    
-                    if estimated_output > best_output:
-                        best_output = estimated_output
-                        best_route = {
-                            'dex': dex_id,
-                            'dex_name': dex_info['name'],
-                            'input_amount': amount,
-                            'expected_output': estimated_output,
-                            'fee': dex_info['fee'],
-                            'pair': pair
-                        }
+            # Candidate paths ranked by compounded marginal rate (-log weights)
+            for cost, path in self.token_graph.k_best_paths(token_in, token_out, k=3, max_hops=max_hops):
+                # Spot ranking ignores trade size, so re-quote candidates against reserves
+                estimated_output, fee_amounts, hop_outputs = self.quote_path(path, amount)
+                
+                if estimated_output > best_output:
+                    best_output = estimated_output
+                    best_route = self._build_route(
+                        token_in, token_out, amount, path, cost, estimated_output, fee_amounts, hop_outputs
+                    )
             
             return best_route
         
+        async def fetch_dex_quotes(self, token_in, token_out, amount):
+            """Direct quotes from every DEX adapter at once; venues that time out are listed in 'errors'"""
+            return await self.quote_router.quote_all(self._token(token_in), self._token(token_out), amount)
+        
+        def compare_dex_quotes(self, token_in, token_out, amount):
+            """Blocking version of fetch_dex_quotes for callers without an event loop"""
+            return self.quote_router.quote_all_sync(self._token(token_in), self._token(token_out), amount)
+        
+        def _build_route(self, token_in, token_out, amount, path, cost, expected_output,
+                         fee_amounts, hop_outputs):
+            """Describe a swap path in the route format used by the agent"""
+            # Output at the compounded spot rate, i.e. with zero price impact
+            spot_output = amount * math.exp(-cost)
+            venues = list(dict.fromkeys(edge.venue for edge in path))
+            retained = 1
+            for edge in path:
+                retained *= 1 - edge.fee
+            
+            return {
+                'dex': venues[0] if len(venues) == 1 else 'multi',
+                'dex_name': ' → '.join(self.supported_dexes[venue]['name'] for venue in venues),
+                'input_amount': amount,
+                'expected_output': expected_output,
+                'fee': 1 - retained,
+                'price_impact': (1 - expected_output / spot_output) * 100 if spot_output else 0,
+                'minimum_received': expected_output * 0.99,  # 1% slippage tolerance
+                'pair': f"{token_in}/{token_out}",
+                'path': [token_in] + [edge.token_out for edge in path],
+                'hops': [
+                    {
+                        'dex': edge.venue,
+                        'pool': edge.pool_key,
+                        'token_in': edge.token_in,
+                        'token_out': edge.token_out,
+                        'fee': edge.fee,
+                        'fee_amount': fee_amount,
+                        'expected_output': hop_output
+                    }
+                    for edge, fee_amount, hop_output in zip(path, fee_amounts, hop_outputs)
+                ]
+            }
+        
+        def split_swap(self, token_in, token_out, amount, extra_legs=None):
+            """Split a swap across every pool listing the pair to maximise total output"""
+            token_in, token_out = self._token(token_in), self._token(token_out)
+            legs = [
+                {
+                    'dex': edge.venue,
+                    'pool': edge.pool_key,
+                    'fee': edge.fee,
+                    'curve': curve_coefficients(edge.reserve_in, edge.reserve_out, edge.fee)
+                }
+                for edge in self.token_graph.edges_between(token_in, token_out)
+            ]
+            # Legs from pools outside the registry
+            for leg in extra_legs or []:
+                legs.append({
+                    'dex': leg['dex'],
+                    'pool': leg['pool'],
+                    'fee': leg['fee'],
+                    'curve': curve_coefficients(leg['input_reserve'], leg['output_reserve'], leg['fee'])
+                })
+            if not legs:
+                return None
+            
+            allocations = split_order([leg['curve'] for leg in legs], amount)
+            
+            funded_legs = []
+            for leg, leg_amount in zip(legs, allocations):
+                if leg_amount <= 0:
+                    continue
+                funded_legs.append({
+                    'dex': leg['dex'],
+                    'pool': leg['pool'],
+                    'fee': leg['fee'],
+                    'input_amount': leg_amount,
+                    'expected_output': curve_output(leg['curve'], leg_amount)
+                })
+            
+            return {
+                'pair': f"{token_in}/{token_out}",
+                'input_amount': amount,
+                'expected_output': sum(leg['expected_output'] for leg in funded_legs),
+                'single_leg_output': max(curve_output(leg['curve'], amount) for leg in legs),
+                'legs': funded_legs
+            }
+        
         def get_aggregated_liquidity(self, token_pair):
             """Get total liquidity across all DEXes for a token pair"""
             total_liquidity = 0
             dex_breakdown = {}
             
-            for dex_id, dex_info in self.supported_dexes.items():
-                if token_pair in dex_info['liquidity_pools']:
-                    # Mock liquidity data
-                    dex_liquidity = {
-                        'ALGO/USDC': 2100000,  # $2.1M
-                        'ALGO/USDT': 1800000,  # $1.8M
-                        'ALGO/AKTA': 450000,   # $450K
-                        'ALGO/STBL': 320000,   # $320K
-                        'ALGO/BANK': 180000,   # $180K
-                        'ALGO/PACT': 95000,    # $95K
-                        'ALGO/VOTE': 45000     # $45K
-                    }.get(token_pair, 100000)  # Default $100K
-                    
-                    total_liquidity += dex_liquidity
-                    dex_breakdown[dex_id] = {
-                        'name': dex_info['name'],
-                        'liquidity': dex_liquidity,
-                        'fee': dex_info['fee']
-                    }
+            # Canonical (asset id, asset id) lookup: 'USDC/ALGO', aliases and id tuples all resolve
+            try:
+                asset_a, asset_b = self.registry.resolve_pair(token_pair)
+            except KeyError:
+                # An unknown token has no pools anywhere
+                return {
+                    'total_liquidity': total_liquidity,
+                    'dex_breakdown': dex_breakdown,
+                    'pair': token_pair,
+                    'depth': {}
+                }
+            token_a = self.registry.symbol(asset_a) or asset_a
+            token_b = self.registry.symbol(asset_b) or asset_b
+            for pool in self.registry.records(self.registry.pools_for_pair(asset_a, asset_b)):
+                dex_info = self.supported_dexes.get(pool.venue)
+                if dex_info is None:
+                    continue
+                
+                total_liquidity += pool.total_liquidity
+                breakdown = dex_breakdown.setdefault(pool.venue, {
+                    'name': dex_info['name'],
+                    'liquidity': 0,
+                    'fee': pool.fee
+                })
+                breakdown['liquidity'] += pool.total_liquidity
             
             return {
                 'total_liquidity': total_liquidity,
                 'dex_breakdown': dex_breakdown,
-                'pair': token_pair
+                'pair': token_pair,
+                # Input needed to move the marginal price by each level, in each direction
+                'depth': {
+                    f"{token_a}->{token_b}": self.depth.curve(asset_a, asset_b),
+                    f"{token_b}->{token_a}": self.depth.curve(asset_b, asset_a)
+                }
             }
         
-        def detect_arbitrage_opportunities(self):
+        def swap_capacity(self, token_in, token_out, max_price_impact=0.01):
+            """Largest input across all DEXes that keeps the price move within max_price_impact"""
+            depth = self.depth.pair(token_in, token_out)
+            if not depth:
+                return None
+            
+            amount = depth.amount_for_impact(max_price_impact)
+            return {
+                'token_in': token_in,
+                'token_out': token_out,
+                'max_price_impact': max_price_impact,
+                'max_input': amount,
+                'allocation': depth.allocation(amount)
+            }
+        
+        def detect_arbitrage_opportunities(self, limit=None):
             """Detect price differences across DEXes for arbitrage"""
             opportunities = []
             
-            # Mock arbitrage detection
-            mock_opportunities = [
-                {
-                    'pair': 'ALGO/USDC',
-                    'buy_dex': 'pact',
-                    'sell_dex': 'tinyman',
-                    'price_difference': 0.0015,  # 0.15%
-                    'potential_profit': 0.0007,  # 0.07% after fees
-                    'max_size': 50000  # Max profitable size
-                },
-                {
-                    'pair': 'ALGO/USDT',
-                    'buy_dex': 'algofi',
-                    'sell_dex': 'tinyman',
-                    'price_difference': 0.0008,  # 0.08%
-                    'potential_profit': 0.0002,  # 0.02% after fees
-                    'max_size': 25000
-                }
-            ]
+            # Profitable cycles are tracked incrementally as reserves change
+            for cycle in self.arbitrage.opportunities(limit):
+                opportunities.append({
+                    'pair': '/'.join(cycle['cycle'][:-1]),
+                    'cycle': cycle['cycle'],
+                    'buy_dex': cycle['hops'][0]['dex'],
+                    'sell_dex': cycle['hops'][-1]['dex'],
+                    'hops': cycle['hops'],
+                    'potential_profit': cycle['rate_of_return'],  # After fees
+                    'max_size': cycle['max_size'],  # Profit-maximising size
+                    'expected_profit': cycle['expected_profit']
+                })
             
-            return mock_opportunities
+            return opportunities
         
         def execute_dex_operation(self, operation_type, parameters):
             """Execute DEX operation with optimal routing"""
@@ -151,6 +320,26 @@ def open_dex_contract():
                 result['route'] = route
                 result['status'] = 'routed'
                 
+                if parameters.get('split', True):
+                    split = self.split_swap(
+                        parameters['token_in'],
+                        parameters['token_out'],
+                        parameters['amount'],
+                        parameters.get('extra_legs')
+                    )
+                    # Only worth the extra transactions when more than one leg is funded
+                    if split and len(split['legs']) > 1:
+                        result['split'] = split
+                
+            elif operation_type == 'quote':
+                quotes = self.compare_dex_quotes(
+                    parameters['token_in'],
+                    parameters['token_out'],
+                    parameters['amount']
+                )
+                result['quotes'] = quotes
+                result['status'] = 'partial' if quotes['partial'] else 'quoted'
+                
             elif operation_type == 'add_liquidity':
                 result['pool'] = f"{parameters['token_a']}/{parameters['token_b']}"
                 result['estimated_lp_tokens'] = parameters['amount_a'] + parameters['amount_b']
@@ -161,6 +350,8 @@ def open_dex_contract():
                 result['status'] = 'opportunities_found'
             
             return result
+    
+    return DEXRouter(registry)
 
 def main():
     """Demo of DEX contract functionality"""
@@ -176,21 +367,49 @@ def main():
         print(f"   Best DEX: {route['dex_name']}")
         print(f"   Expected Output: {route['expected_output']:.2f} USDC")
         print(f"   Fee: {route['fee']*100:.2f}%")
+        print(f"   Price Impact: {route['price_impact']:.3f}%")
+    
+    # Demo: Multi-hop route
+    print("\n🧭 Finding multi-hop route for STBL → BANK swap:")
+    route = dex_router.find_best_route('STBL', 'BANK', 1000)
+    if route:
+        print(f"   Path: {' → '.join(route['path'])} via {route['dex_name']}")
+        print(f"   Expected Output: {route['expected_output']:.2f} BANK")
     
     # Demo: Get liquidity info
     print("\n💧 Aggregated liquidity for ALGO/USDC:")
     liquidity = dex_router.get_aggregated_liquidity('ALGO/USDC')
-    print(f"   Total Liquidity: ${liquidity['total_liquidity']:,}")
+    print(f"   Total Liquidity: ${liquidity['total_liquidity']:,.0f}")
     for dex_id, info in liquidity['dex_breakdown'].items():
-        print(f"   {info['name']}: ${info['liquidity']:,} (Fee: {info['fee']*100:.2f}%)")
+        print(f"   {info['name']}: ${info['liquidity']:,.0f} (Fee: {info['fee']*100:.2f}%)")
+    for level, amount in liquidity['depth']['ALGO->USDC']:
+        print(f"   Depth to move price {level*100:.1f}%: {amount:,.0f} ALGO")
     
     # Demo: Arbitrage opportunities
     print("\n⚡ Current arbitrage opportunities:")
     opportunities = dex_router.detect_arbitrage_opportunities()
     for opp in opportunities:
-        print(f"   {opp['pair']}: {opp['potential_profit']*100:.3f}% profit")
+        print(f"   {' → '.join(opp['cycle'])}: {opp['potential_profit']*100:.3f}% profit")
         print(f"      Buy on {opp['buy_dex'].title()}, sell on {opp['sell_dex'].title()}")
-        print(f"      Max size: {opp['max_size']:,} ALGO")
+        print(f"      Max size: {opp['max_size']:,.0f} {opp['cycle'][0]}")
+    if not opportunities:
+        print("   No profitable cycles at current reserves")
+    
+    # Demo: Concurrent quotes, with stub adapters standing in for slow DEX APIs
+    print("\n📡 Concurrent DEX quotes for ALGO → USDC (stub latencies):")
+    stubs = [
+        StubAdapter(adapter, latency=latency, tail_latency=0.3, tail_probability=0.2, seed=seed)
+        for seed, (adapter, latency) in enumerate(zip(dex_router.quote_router.adapters, (0.02, 0.04, 0.6)))
+    ]
+    stub_router = AsyncQuoteRouter(stubs, timeout=0.25, hedge_after=0.05)
+    quotes = stub_router.quote_all_sync('ALGO', 'USDC', 1000)
+    for quote in quotes['quotes']:
+        print(f"   {quote['dex_name']}: {quote['expected_output']:.2f} USDC")
+    for dex_id in quotes['unlisted']:
+        print(f"   {dex_router.supported_dexes[dex_id]['name']}: pair not listed")
+    for dex_id, error in quotes['errors'].items():
+        print(f"   {dex_router.supported_dexes[dex_id]['name']}: {error}")
+    print(f"   Answered in {quotes['elapsed_ms']:.0f} ms (partial: {quotes['partial']}, hedged: {quotes['hedged'] or 'none'})")
     
     # Demo: Execute operation
     print("\n🚀 Executing swap operation:")
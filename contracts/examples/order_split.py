@@ -0,0 +1,70 @@
+"""
+Order Split
+===========
+Optimal distribution of one swap across several constant product legs.
+Used by the Aether AI "/openDEX" router for large swaps where a single pool's
+price impact costs more than routing through extra legs.
+
+Features:
+- Exact water-filling solution (equal marginal rate on every active leg)
+- O(n log n) in the number of legs, no iterative search
+- Works for direct pools and folded multi-hop paths alike
+"""
+
+import math
+
+from amm_math import curve_output
+
+
+def split_order(curves, amount):
+    """
+    Split an input amount across (alpha, beta) swap curves to maximise output.
+
+    Each leg pays output = alpha * x / (beta + x), whose marginal rate
+    alpha * beta / (beta + x)^2 falls as the leg gets more input. At the
+    optimum every funded leg has the same marginal rate and unfunded legs
+    start below it. Returns per-leg input amounts in the order given.
+    """
+    allocations = [0.0] * len(curves)
+    if amount <= 0 or not curves:
+        return allocations
+
+    # Best spot rate first: legs join the active set in this order
+    order = sorted(
+        (i for i, (alpha, beta) in enumerate(curves) if alpha > 0 and beta > 0),
+        key=lambda i: curves[i][0] / curves[i][1],
+        reverse=True
+    )
+    if not order:
+        return allocations
+
+    sqrt_sum = 0.0
+    beta_sum = 0.0
+    active = 0
+    for position, i in enumerate(order):
+        alpha, beta = curves[i]
+        sqrt_sum += math.sqrt(alpha * beta)
+        beta_sum += beta
+        active = position + 1
+        # Common marginal rate if exactly these legs are funded
+        marginal = (sqrt_sum / (amount + beta_sum)) ** 2
+        if position + 1 == len(order):
+            break
+        next_alpha, next_beta = curves[order[position + 1]]
+        if next_alpha / next_beta <= marginal:
+            break
+
+    root = math.sqrt(marginal)
+    for i in order[:active]:
+        alpha, beta = curves[i]
+        allocations[i] = max(math.sqrt(alpha * beta) / root - beta, 0.0)
+
+    # Absorb floating point drift so legs sum exactly to the order size
+    drift = amount - sum(allocations)
+    allocations[order[0]] += drift
+    return allocations
+
+
+def split_output(curves, allocations):
+    """Total output of a split produced by split_order"""
+    return sum(curve_output(curve, x) for curve, x in zip(curves, allocations) if x > 0)
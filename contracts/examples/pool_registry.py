@@ -0,0 +1,321 @@
+"""
+Pool Registry
+=============
+Compact, shared store of liquidity pool state for the Aether AI DEX examples.
+Both the "/openDEX" router and the "/connectTinyman" connector read pools
+from here instead of keeping their own nested dicts.
+
+Features:
+- Column storage in typed arrays (one row per pool, no per-pool dict)
+- Slotted PoolRecord views for attribute access
+- O(1) lookup by pool id, by asset id and by canonical (asset id, asset id) pair
+- Symbol aliases and 'A/B' pair strings resolved in either order
+- Version counter and change listeners for incremental consumers
+- Atomic multi-pool updates under a registry lock
+"""
+
+import logging
+import math
+import threading
+import weakref
+from array import array
+from collections import defaultdict
+
+
+# ASA ids for the assets used in the demo pool universe (ALGO is asset 0)
+ASSET_IDS = {
+    'ALGO': 0,
+    'USDC': 31566704,
+    'USDT': 312769,
+    'AKTA': 523683256,
+    'GARD': 684649988,
+    'STBL': 465865291,
+    'BANK': 900652777,
+    'PACT': 744403216,
+    'VOTE': 452399768
+}
+
+# Mock pool data - in reality would be synced from the DEX contracts
+DEFAULT_POOLS = [
+    # pool_id, venue, asset_1, asset_2, reserve_1, reserve_2, fee, apr, volume_24h, total_liquidity
+    ('ALGO_USDC', 'tinyman', 'ALGO', 'USDC', 1050000, 1050000, 0.0025, 0.12, 450000, 2100000),
+    ('ALGO_USDT', 'tinyman', 'ALGO', 'USDT', 900000, 900000, 0.0025, 0.095, 320000, 1800000),
+    ('ALGO_AKTA', 'tinyman', 'ALGO', 'AKTA', 225000, 225000, 0.0025, 0.18, 85000, 450000),
+    ('ALGO_GARD', 'tinyman', 'ALGO', 'GARD', 160000, 160000, 0.0025, 0.22, 65000, 320000),
+    ('ALGO_STBL', 'algofi', 'ALGO', 'STBL', 160000, 160000, 0.003, 0.0, 0, 320000),
+    ('ALGO_BANK', 'algofi', 'ALGO', 'BANK', 90000, 90000, 0.003, 0.0, 0, 180000),
+    ('ALGO_PACT', 'pact', 'ALGO', 'PACT', 47500, 47500, 0.002, 0.0, 0, 95000),
+    ('ALGO_VOTE', 'pact', 'ALGO', 'VOTE', 22500, 22500, 0.002, 0.0, 0, 45000)
+]
+
+# Columns that may be changed after a pool is registered
+MUTABLE_FIELDS = ('reserve_1', 'reserve_2', 'fee', 'apr', 'volume_24h', 'total_liquidity')
+
+# Reserves must stay positive (spot rates divide by them); the rest only non-negative
+POSITIVE_FIELDS = ('reserve_1', 'reserve_2')
+
+logger = logging.getLogger(__name__)
+
+
+def validate_field(field, value):
+    """Return value as a float if it is acceptable for a mutable pool column, else raise ValueError"""
+    if field not in MUTABLE_FIELDS:
+        raise ValueError(f"Unknown pool field: {field}")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{field} must be finite, got {value}")
+    if field in POSITIVE_FIELDS and value <= 0:
+        raise ValueError(f"{field} must be positive, got {value}")
+    if value < 0 or (field == 'fee' and value >= 1):
+        raise ValueError(f"{field} out of range: {value}")
+    return value
+
+
+# Fixed-width numeric columns and their array typecodes (also the snapshot layout)
+COLUMNS = (
+    ('asset_1_ids', 'q'), ('asset_2_ids', 'q'),
+    ('reserve_1', 'd'), ('reserve_2', 'd'), ('fee', 'd'),
+    ('apr', 'd'), ('volume_24h', 'd'), ('total_liquidity', 'd')
+)
+
+
+class PoolRecord:
+    """Lightweight view of one registry row"""
+
+    __slots__ = ('registry', 'row')
+
+    def __init__(self, registry, row):
+        self.registry = registry
+        self.row = row
+
+    pool_id = property(lambda self: self.registry.pool_ids[self.row])
+    venue = property(lambda self: self.registry.venues[self.row])
+    asset_1_id = property(lambda self: self.registry.asset_1_ids[self.row])
+    asset_2_id = property(lambda self: self.registry.asset_2_ids[self.row])
+    asset_1 = property(lambda self: self.registry.asset_symbols[self.asset_1_id])
+    asset_2 = property(lambda self: self.registry.asset_symbols[self.asset_2_id])
+    reserve_1 = property(lambda self: self.registry.reserve_1[self.row])
+    reserve_2 = property(lambda self: self.registry.reserve_2[self.row])
+    fee = property(lambda self: self.registry.fee[self.row])
+    apr = property(lambda self: self.registry.apr[self.row])
+    volume_24h = property(lambda self: self.registry.volume_24h[self.row])
+    total_liquidity = property(lambda self: self.registry.total_liquidity[self.row])
+
+
+class PoolRegistry:
+    """Array-backed pool table indexed by pool id and asset id"""
+
+    def __init__(self):
+        self.pool_ids = []                      # row -> pool id
+        self.rows = {}                          # pool id -> row
+        self.venues = []                        # row -> venue (dex id)
+        # Typed arrays, or memoryviews over a mapped snapshot until the first add_pool
+        for column, typecode in COLUMNS:
+            setattr(self, column, array(typecode))
+
+        self.asset_symbols = {}                 # asset id -> canonical symbol
+        self.asset_ids = {}                     # symbol or alias -> asset id
+        self.asset_pools = defaultdict(list)    # asset id -> [row]
+        self.pair_pools = defaultdict(list)     # (lower asset id, higher asset id) -> [row]
+        self.pair_names = {}                    # 'A/B' string -> (asset id, asset id), cached on resolve
+        self.venue_pools = defaultdict(list)    # venue -> [row]
+
+        self.version = 0
+        self._listeners = []
+        # Held while updates are applied; readers needing a consistent multi-pool view take it too
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.pool_ids)
+
+    def __contains__(self, pool_id):
+        return pool_id in self.rows
+
+    def register_asset(self, symbol, asset_id):
+        """Record the symbol used for an asset id"""
+        self.asset_symbols[asset_id] = symbol
+        self.asset_ids[symbol] = asset_id
+
+    def register_alias(self, alias, asset):
+        """Make alias resolve to an already registered asset (id or symbol)"""
+        self.asset_ids[alias] = self.resolve_asset(asset)
+
+    def resolve_asset(self, asset):
+        """Accept an asset id, symbol or alias and return the asset id"""
+        if isinstance(asset, int):
+            return asset
+        return self.asset_ids[asset]
+
+    def symbol(self, asset):
+        """Canonical symbol for an asset id, symbol or alias, or None if unknown"""
+        asset_id = asset if isinstance(asset, int) else self.asset_ids.get(asset)
+        return self.asset_symbols.get(asset_id)
+
+    def pair_key(self, asset_a, asset_b):
+        """Canonical key of a pair: both asset ids, lower first"""
+        asset_a = self.resolve_asset(asset_a)
+        asset_b = self.resolve_asset(asset_b)
+        return (asset_a, asset_b) if asset_a <= asset_b else (asset_b, asset_a)
+
+    def resolve_pair(self, pair):
+        """
+        (asset id, asset id) in the requested order for an 'A/B' string or a
+        two-item sequence of ids, symbols or aliases. Parsed strings are cached.
+        """
+        if not isinstance(pair, str):
+            asset_a, asset_b = pair
+            return self.resolve_asset(asset_a), self.resolve_asset(asset_b)
+        resolved = self.pair_names.get(pair)
+        if resolved is None:
+            asset_a, asset_b = pair.split('/')
+            resolved = self.pair_names[pair] = (self.resolve_asset(asset_a), self.resolve_asset(asset_b))
+        return resolved
+
+    def add_pool(self, pool_id, venue, asset_1, asset_2, reserve_1, reserve_2, fee,
+                 apr=0.0, volume_24h=0.0, total_liquidity=0.0):
+        """Register a pool, notify listeners and return its row"""
+        if pool_id in self.rows:
+            raise ValueError(f"Pool {pool_id} is already registered")
+
+        asset_1_id = self.resolve_asset(asset_1)
+        asset_2_id = self.resolve_asset(asset_2)
+
+        with self.lock:
+            row = len(self.pool_ids)
+            if not isinstance(self.reserve_1, array):
+                self._materialize()
+
+            self.pool_ids.append(pool_id)
+            self.rows[pool_id] = row
+            self.venues.append(venue)
+            self.asset_1_ids.append(asset_1_id)
+            self.asset_2_ids.append(asset_2_id)
+            self.reserve_1.append(reserve_1)
+            self.reserve_2.append(reserve_2)
+            self.fee.append(fee)
+            self.apr.append(apr)
+            self.volume_24h.append(volume_24h)
+            self.total_liquidity.append(total_liquidity)
+
+            self._index_row(row)
+            self.version += 1
+            # Graphs, depth curves and score indexes built earlier pick the new pool up from here
+            self._notify((pool_id,))
+        return row
+
+    def _index_row(self, row):
+        """Add a stored row to the asset, pair and venue indexes"""
+        asset_1_id, asset_2_id = self.asset_1_ids[row], self.asset_2_ids[row]
+        self.asset_pools[asset_1_id].append(row)
+        self.asset_pools[asset_2_id].append(row)
+        self.pair_pools[self.pair_key(asset_1_id, asset_2_id)].append(row)
+        self.venue_pools[self.venues[row]].append(row)
+
+    def _materialize(self):
+        """Copy snapshot-backed columns into growable arrays"""
+        with self.lock:
+            for column, typecode in COLUMNS:
+                values = array(typecode)
+                values.frombytes(getattr(self, column).tobytes())
+                setattr(self, column, values)
+
+    def pool(self, pool_id):
+        """PoolRecord for a pool id, or None if unknown"""
+        row = self.rows.get(pool_id)
+        return None if row is None else PoolRecord(self, row)
+
+    def records(self, rows=None):
+        """PoolRecords for the given rows (all pools by default)"""
+        if rows is None:
+            rows = range(len(self.pool_ids))
+        return [PoolRecord(self, row) for row in rows]
+
+    def pools_for_asset(self, asset):
+        """Rows of every pool that trades an asset (id or symbol)"""
+        return self.asset_pools.get(self.resolve_asset(asset), [])
+
+    def pools_for_pair(self, asset_a, asset_b):
+        """Rows of every pool that trades asset_a against asset_b, in either order"""
+        return self.pair_pools.get(self.pair_key(asset_a, asset_b), [])
+
+    def pool_for_pair(self, pair, venue=None):
+        """Deepest pool for an 'A/B' string or (asset, asset) pair, optionally on one venue"""
+        rows = [
+            row for row in self.pools_for_pair(*self.resolve_pair(pair))
+            if venue is None or self.venues[row] == venue
+        ]
+        if not rows:
+            return None
+        return PoolRecord(self, max(rows, key=self.total_liquidity.__getitem__))
+
+    def update_pool(self, pool_id, **fields):
+        """Change mutable columns of one pool and notify listeners"""
+        self.apply_updates({pool_id: fields})
+
+    def apply_updates(self, updates):
+        """
+        Apply {pool_id: {field: value}} for many pools as one atomic change.
+
+        Every update is validated before any column is written, the version
+        is bumped once and listeners get a single notification listing all
+        changed pools.
+        """
+        resolved = []
+        for pool_id, fields in updates.items():
+            row = self.rows.get(pool_id)
+            if row is None:
+                raise KeyError(f"Unknown pool: {pool_id}")
+            # Values are checked too, so a bad update never leaves the registry half-applied
+            resolved.append((row, {field: validate_field(field, value) for field, value in fields.items()}))
+        if not resolved:
+            return
+
+        with self.lock:
+            for row, fields in resolved:
+                for field, value in fields.items():
+                    getattr(self, field)[row] = value
+            self.version += 1
+            self._notify(tuple(updates))
+
+    def subscribe(self, listener):
+        """Call listener(pool_ids) after pool state changes (held weakly for bound methods)"""
+        if hasattr(listener, '__self__'):
+            self._listeners.append(weakref.WeakMethod(listener))
+        else:
+            self._listeners.append(lambda: listener)
+
+    def _notify(self, pool_ids):
+        """
+        Deliver a change notification, dropping listeners that were garbage collected.
+
+        A listener that raises is logged and skipped so the others still see
+        the change; the registry columns are already committed at this point.
+        """
+        alive = []
+        for ref in self._listeners:
+            listener = ref()
+            if listener is not None:
+                try:
+                    listener(pool_ids)
+                except Exception:
+                    logger.exception("Pool listener %r failed for %d pool(s)", listener, len(pool_ids))
+                alive.append(ref)
+        self._listeners = alive
+
+
+_default_registry = None
+
+
+def default_registry():
+    """Shared registry holding the demo pool universe, built on first use"""
+    global _default_registry
+    if _default_registry is None:
+        registry = PoolRegistry()
+        for symbol, asset_id in ASSET_IDS.items():
+            registry.register_asset(symbol, asset_id)
+        for pool in DEFAULT_POOLS:
+            registry.add_pool(*pool)
+        _default_registry = registry
+    return _default_registry
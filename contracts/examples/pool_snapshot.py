@@ -0,0 +1,245 @@
+"""
+Pool Snapshots
+==============
+Compact binary snapshots of the pool registry behind the Aether AI
+"/openDEX" and "/connectTinyman" commands, so service workers start by
+mapping a file instead of fetching and parsing pool state.
+
+Features:
+- Fixed-width little-endian columns (8 bytes per pool per field), 8-byte
+  aligned, plus NUL-separated string tables for pool ids, symbols and venues
+- Loading maps the file copy-on-write: numeric columns are memoryviews over
+  the mapping, so workers share clean pages and only pools they update
+  get private copies
+- Atomic writes (temp file + rename), so readers never see a partial file
+
+Usage:
+    python pool_snapshot.py write pools.snap              # demo registry
+    python pool_snapshot.py write pools.snap --pools 100000
+    python pool_snapshot.py info pools.snap
+
+Layout: header, section table of (offset, size) pairs, then the sections in
+SECTIONS order. Version and layout changes bump FORMAT_VERSION.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from pool_registry import COLUMNS, PoolRegistry, default_registry
+
+MAGIC = b'AETHPOOL'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# magic, format version, pools, assets, aliases, venues, registry version
+HEADER = struct.Struct('<8sIIIIIQ')
+SECTIONS = tuple(column for column, _ in COLUMNS) + (
+    'venue_index', 'asset_ids', 'alias_ids', 'pool_id_names', 'symbol_names', 'alias_names', 'venue_names'
+)
+SECTION_TABLE = struct.Struct('<' + 'QQ' * len(SECTIONS))
+
+
+class SnapshotError(ValueError):
+    """A file is not a pool snapshot this code can read"""
+
+
+def _names(blob):
+    return str(blob, 'utf-8').split('\0') if len(blob) else []
+
+
+def _blob(names):
+    return '\0'.join(names).encode('utf-8')
+
+
+def _map(path, access):
+    """Map a whole file; an empty one raises SnapshotError (mmap refuses zero-length files)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SnapshotError(f"{path}: empty file, not a pool snapshot")
+        return mmap.mmap(f.fileno(), 0, access=access)
+
+
+def write_snapshot(registry, path):
+    """
+    Write the registry to path atomically; returns the snapshot size in bytes.
+
+    Pool ids, asset symbols and aliases, and venues are stored as
+    NUL-separated UTF-8, so they must be str without NUL characters.
+    """
+    with registry.lock:
+        for kind, names in (('pool id', registry.pool_ids), ('asset name', registry.asset_ids),
+                            ('venue', registry.venues)):
+            for name in names:
+                if not isinstance(name, str) or '\0' in name:
+                    raise SnapshotError(f"Can't snapshot {kind} {name!r}: must be a str without NUL characters")
+        count = len(registry)
+        venue_names = list(dict.fromkeys(registry.venues))
+        venue_of = {venue: index for index, venue in enumerate(venue_names)}
+        aliases = [
+            (name, asset_id) for name, asset_id in registry.asset_ids.items()
+            if registry.asset_symbols.get(asset_id) != name
+        ]
+        payloads = {column: getattr(registry, column).tobytes() for column, _ in COLUMNS}
+        payloads.update({
+            'venue_index': array('H', (venue_of[venue] for venue in registry.venues)).tobytes(),
+            'asset_ids': array('q', registry.asset_symbols).tobytes(),
+            'alias_ids': array('q', (asset_id for _, asset_id in aliases)).tobytes(),
+            'pool_id_names': _blob(registry.pool_ids),
+            'symbol_names': _blob(registry.asset_symbols.values()),
+            'alias_names': _blob(name for name, _ in aliases),
+            'venue_names': _blob(venue_names)
+        })
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, count, len(registry.asset_symbols), len(aliases),
+            len(venue_names), registry.version
+        )
+
+    offsets = []
+    offset = HEADER.size + SECTION_TABLE.size
+    for name in SECTIONS:
+        offset += -offset % ALIGNMENT
+        offsets += [offset, len(payloads[name])]
+        offset += len(payloads[name])
+
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(SECTION_TABLE.pack(*offsets))
+        for name, section_offset in zip(SECTIONS, offsets[::2]):
+            f.write(b'\0' * (section_offset - f.tell()))
+            f.write(payloads[name])
+        size = f.tell()
+    os.replace(temp_path, path)
+    return size
+
+
+def _read_header(mapped, path):
+    """(header fields, {section: memoryview}) after validating the file"""
+    if len(mapped) < HEADER.size + SECTION_TABLE.size:
+        raise SnapshotError(f"{path}: too short for a pool snapshot")
+    fields = HEADER.unpack_from(mapped)
+    if fields[0] != MAGIC:
+        raise SnapshotError(f"{path}: not a pool snapshot")
+    if fields[1] != FORMAT_VERSION:
+        raise SnapshotError(f"{path}: snapshot format {fields[1]}, expected {FORMAT_VERSION}")
+    if sys.byteorder != 'little':
+        raise SnapshotError("Pool snapshots are little-endian and can't be mapped on this host")
+
+    table = SECTION_TABLE.unpack_from(mapped, HEADER.size)
+    view = memoryview(mapped)
+    sections = {}
+    for name, offset, size in zip(SECTIONS, table[::2], table[1::2]):
+        if offset + size > len(mapped):
+            raise SnapshotError(f"{path}: section {name} runs past the end of the file")
+        sections[name] = view[offset:offset + size]
+    return fields, sections
+
+
+def load_snapshot(path):
+    """
+    PoolRegistry backed by a mapped snapshot.
+
+    Numeric columns stay in the mapping (copy-on-write, so update_pool works
+    and never touches the file); string tables and the lookup indexes are
+    rebuilt in memory. The first add_pool copies the columns into arrays.
+    Any file that doesn't decode raises SnapshotError.
+    """
+    mapped = _map(path, mmap.ACCESS_COPY)
+    try:
+        return _decode(mapped, path)
+    except SnapshotError:
+        raise
+    except (struct.error, TypeError, LookupError, ValueError) as error:
+        # Misaligned sections, bad UTF-8 or out-of-range indexes: the file is corrupt
+        raise SnapshotError(f"{path}: corrupt pool snapshot ({error})") from error
+
+
+def _decode(mapped, path):
+    fields, sections = _read_header(mapped, path)
+    _, _, count, asset_count, _, _, version = fields
+
+    registry = PoolRegistry()
+    for column, typecode in COLUMNS:
+        values = sections[column].cast(typecode)
+        if len(values) != count:
+            raise SnapshotError(f"{path}: column {column} has {len(values)} rows, expected {count}")
+        setattr(registry, column, values)
+
+    for symbol, asset_id in zip(_names(sections['symbol_names']), sections['asset_ids'].cast('q')):
+        registry.register_asset(symbol, asset_id)
+    for alias, asset_id in zip(_names(sections['alias_names']), sections['alias_ids'].cast('q')):
+        registry.asset_ids[alias] = asset_id
+
+    venue_names = _names(sections['venue_names'])
+    registry.pool_ids = _names(sections['pool_id_names'])
+    registry.rows = {pool_id: row for row, pool_id in enumerate(registry.pool_ids)}
+    registry.venues = [venue_names[index] for index in sections['venue_index'].cast('H')]
+    if len(registry.pool_ids) != count or len(registry.asset_symbols) != asset_count:
+        raise SnapshotError(f"{path}: string tables don't match the header counts")
+    for row in range(count):
+        registry._index_row(row)
+
+    registry.version = version
+    registry.snapshot_path = path
+    return registry
+
+
+def snapshot_info(path):
+    """Header summary of a snapshot without loading it"""
+    mapped = _map(path, mmap.ACCESS_READ)
+    fields, sections = _read_header(mapped, path)
+    try:
+        venues = _names(sections['venue_names'])
+    except UnicodeDecodeError as error:
+        raise SnapshotError(f"{path}: corrupt pool snapshot ({error})") from error
+    return {
+        'path': path,
+        'format_version': fields[1],
+        'pools': fields[2],
+        'assets': fields[3],
+        'aliases': fields[4],
+        'venues': venues,
+        'registry_version': fields[6],
+        'bytes': len(mapped)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write or inspect pool registry snapshots")
+    commands = parser.add_subparsers(dest='command', required=True)
+    write = commands.add_parser('write', help="snapshot the demo registry or a synthetic universe")
+    write.add_argument('path')
+    write.add_argument('--pools', type=int, help="synthetic universe size (see bench_offchain.py)")
+    write.add_argument('--seed', type=int, default=7)
+    info = commands.add_parser('info', help="print a snapshot's header and time a load")
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'write':
+        if args.pools:
+            from bench_offchain import synthetic_registry
+            registry = synthetic_registry(args.pools, args.seed)
+        else:
+            registry = default_registry()
+        size = write_snapshot(registry, args.path)
+        print(f"💾 {len(registry):,} pools written to {args.path} ({size / 1024:,.1f} KiB)")
+        return
+
+    summary = snapshot_info(args.path)
+    t0 = time.perf_counter()
+    registry = load_snapshot(args.path)
+    elapsed = time.perf_counter() - t0
+    print(f"📦 {summary['path']} (format v{summary['format_version']}, {summary['bytes'] / 1024:,.1f} KiB)")
+    print(f"   Pools: {summary['pools']:,}  Assets: {summary['assets']:,}  Aliases: {summary['aliases']:,}")
+    print(f"   Venues: {', '.join(summary['venues'])}")
+    print(f"   Registry version: {summary['registry_version']}")
+    print(f"   Loaded in {elapsed * 1000:.1f} ms ({len(registry):,} pools mapped)")
+
+
+if __name__ == "__main__":
+    main()
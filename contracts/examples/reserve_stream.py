@@ -0,0 +1,205 @@
+"""
+Reserve Stream
+==============
+Ingestion pipeline that keeps the shared pool registry in sync with a stream
+of reserve and volume events. Quoting, routing and analytics for the Aether AI
+DEX commands then see fresh reserves without polling or rebuilding state.
+
+Features:
+- JSON-lines events from a file, stdin or a local TCP/Unix socket
+- Per-pool coalescing of bursts within a time window (last value wins per field)
+- Each window applied to the registry as one atomic update
+
+Event format (one JSON object per line):
+    {"pool_id": "ALGO_USDC", "reserve_1": 1049000, "reserve_2": 1051003, "volume_24h": 451200}
+
+Usage:
+    python reserve_stream.py events.jsonl
+    tail -f events.jsonl | python reserve_stream.py -
+    python reserve_stream.py tcp://127.0.0.1:9100 --window 0.25
+
+Running this script only updates its own process's registry (useful for
+replaying and inspecting a stream). Quoting processes follow a stream in
+process: LocalAI does so when RESERVE_STREAM is set to one of the sources above.
+"""
+
+import argparse
+import json
+import logging
+import queue
+import socket
+import sys
+import threading
+import time
+
+from pool_registry import MUTABLE_FIELDS, default_registry, validate_field
+
+_END_OF_STREAM = object()
+
+logger = logging.getLogger(__name__)
+
+
+def open_source(source):
+    """Iterate text lines from '-', a file path, tcp://host:port or unix:///path"""
+    if source == '-':
+        return iter(sys.stdin)
+    if source.startswith('tcp://'):
+        host, port = source[len('tcp://'):].rsplit(':', 1)
+        return _socket_lines(socket.create_connection((host, int(port))))
+    if source.startswith('unix://'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(source[len('unix://'):])
+        return _socket_lines(sock)
+    return _file_lines(source)
+
+
+def _file_lines(path):
+    with open(path) as f:
+        yield from f
+
+
+def _socket_lines(sock):
+    with sock, sock.makefile('r') as stream:
+        yield from stream
+
+
+def parse_event(line):
+    """
+    Decode one event line into (pool_id, fields), or None if it is unusable.
+
+    An event without a string pool_id, or with any bad value (non-numeric,
+    bool, NaN/inf, a non-positive reserve, ...) is dropped whole rather than
+    applied in part.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(event, dict) or not isinstance(event.get('pool_id'), str):
+        return None
+    try:
+        fields = {
+            field: validate_field(field, event[field])
+            for field in MUTABLE_FIELDS
+            if field in event
+        }
+    except ValueError:
+        return None
+    if not fields:
+        return None
+    return event['pool_id'], fields
+
+
+class ReserveUpdatePipeline:
+    """Coalesces pool events per window and applies them atomically to a registry"""
+
+    def __init__(self, registry=None, window=0.25, max_pending=10000, on_apply=None):
+        self.registry = registry if registry is not None else default_registry()
+        self.window = window            # seconds to collect a burst before applying
+        self.max_pending = max_pending  # flush early once this many pools are pending
+        self.on_apply = on_apply        # optional callback(pool_ids) after each batch
+        self.pending = {}               # pool_id -> merged fields
+        self.stats = {
+            'events_received': 0,
+            'events_coalesced': 0,
+            'invalid_events': 0,
+            'failed_events': 0,
+            'unknown_pools': 0,
+            'batches_applied': 0,
+            'pools_updated': 0
+        }
+
+    def submit(self, pool_id, fields):
+        """Merge an event into the pending window"""
+        self.stats['events_received'] += 1
+        if pool_id not in self.registry:
+            self.stats['unknown_pools'] += 1
+            return
+        merged = self.pending.get(pool_id)
+        if merged is None:
+            self.pending[pool_id] = dict(fields)
+        else:
+            merged.update(fields)
+            self.stats['events_coalesced'] += 1
+
+    def flush(self):
+        """Apply everything pending as a single registry update"""
+        if not self.pending:
+            return
+        updates, self.pending = self.pending, {}
+        self.registry.apply_updates(updates)
+        self.stats['batches_applied'] += 1
+        self.stats['pools_updated'] += len(updates)
+        if self.on_apply is not None:
+            self.on_apply(tuple(updates))
+
+    def run(self, lines):
+        """Consume an iterable of event lines until it is exhausted"""
+        # A reader thread lets windows close on time even when the source goes quiet
+        events = queue.Queue(maxsize=self.max_pending)
+        reader = threading.Thread(target=self._read, args=(lines, events), daemon=True)
+        reader.start()
+
+        window_closes = None
+        while True:
+            timeout = None if window_closes is None else max(window_closes - time.monotonic(), 0)
+            try:
+                item = events.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _END_OF_STREAM:
+                self.flush()
+                return self.stats
+            if item is not None:
+                try:
+                    parsed = parse_event(item)
+                    if parsed is None:
+                        self.stats['invalid_events'] += 1
+                    else:
+                        self.submit(*parsed)
+                        if window_closes is None:
+                            window_closes = time.monotonic() + self.window
+                except Exception:
+                    # One bad event must not stop the stream (in LocalAI this is a daemon thread)
+                    self.stats['failed_events'] += 1
+                    logger.exception("Skipping reserve event %.200r", item)
+
+            if window_closes is not None and (
+                time.monotonic() >= window_closes or len(self.pending) >= self.max_pending
+            ):
+                self.flush()
+                window_closes = None
+
+    def _read(self, lines, events):
+        try:
+            for line in lines:
+                events.put(line)
+        finally:
+            events.put(_END_OF_STREAM)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream pool reserve updates into the pool registry")
+    parser.add_argument('source', help="'-' for stdin, a file path, tcp://host:port or unix:///path")
+    parser.add_argument('--window', type=float, default=0.25, help="coalescing window in seconds")
+    args = parser.parse_args()
+
+    registry = default_registry()
+
+    def report(pool_ids):
+        print(f"🔄 Applied {len(pool_ids)} pool update(s) → registry version {registry.version}")
+
+    pipeline = ReserveUpdatePipeline(registry, window=args.window, on_apply=report)
+    stats = pipeline.run(open_source(args.source))
+
+    print("\n📊 Stream Summary:")
+    for name, value in stats.items():
+        print(f"   {name.replace('_', ' ').title()}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
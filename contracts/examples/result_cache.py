@@ -0,0 +1,100 @@
+"""
+Result Cache
+============
+Size-bounded LRU cache with per-entry TTL for memoizing analytics results.
+Used by the "/connectTinyman" strategy engine so repeated questions against
+unchanged pool state are answered from memory.
+
+Features:
+- LRU eviction once maxsize entries are held
+- Entries expire ttl seconds after they were stored
+- Hit, miss, eviction and expiry counters
+- Thread-safe for use behind a multi-threaded server
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def _freeze(value):
+    """Hashable, order-independent form of a parameter value, recursing into containers"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)  # 10000 and 10000.0 are the same question
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    # Dicts and sets are tagged so they can't collide with an equal-looking tuple
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted(((key, _freeze(item)) for key, item in value.items()), key=repr)))
+    if isinstance(value, (set, frozenset)):
+        return ('set', tuple(sorted((_freeze(item) for item in value), key=repr)))
+    return repr(value)
+
+
+def normalize_params(params, defaults=None):
+    """Turn a parameter dict into a hashable, order-independent cache key"""
+    merged = dict(defaults or {}, **(params or {}))
+    return tuple((name, _freeze(value)) for name, value in sorted(merged.items()))
+
+
+class TTLCache:
+    """LRU mapping whose entries also expire after a fixed time to live"""
+
+    def __init__(self, maxsize=256, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return (hit, value); expired entries count as misses"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry but keep the counters"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring cache effectiveness"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,51 @@
+"""
+Score Index
+===========
+Incrementally maintained top-k ranking of pools per risk tier.
+Backs the "/connectTinyman" pool recommendations so a chat turn reads the
+best pools instead of rescoring and sorting the whole pool universe.
+
+Features:
+- One sorted list per tier, kept in order with bisect
+- Per-pool updates touch only that pool's entries
+- Top-k reads are a slice of the tier list
+"""
+
+from bisect import bisect_left, insort
+
+
+class ScoreIndex:
+    """Sorted (score, pool) entries for every tier a pool qualifies for"""
+
+    def __init__(self, tier_thresholds):
+        # tier -> minimum liquidity (exclusive) a pool needs to be listed
+        self.tier_thresholds = dict(tier_thresholds)
+        self.tiers = {tier: [] for tier in self.tier_thresholds}
+        self.entries = {}   # pool key -> (sort key, liquidity)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, pool_key, score, liquidity, order=0):
+        """Insert or re-rank a pool; order breaks score ties (lower first)"""
+        self.remove(pool_key)
+        sort_key = (-score, order, pool_key)
+        for tier, threshold in self.tier_thresholds.items():
+            if liquidity > threshold:
+                insort(self.tiers[tier], sort_key)
+        self.entries[pool_key] = (sort_key, liquidity)
+
+    def remove(self, pool_key):
+        """Drop a pool from every tier it is listed in"""
+        entry = self.entries.pop(pool_key, None)
+        if entry is None:
+            return
+        sort_key, liquidity = entry
+        for tier, threshold in self.tier_thresholds.items():
+            if liquidity > threshold:
+                ranked = self.tiers[tier]
+                del ranked[bisect_left(ranked, sort_key)]
+
+    def top(self, tier, k):
+        """Best k (pool_key, score) pairs in a tier"""
+        return [(pool_key, -neg_score) for neg_score, _, pool_key in self.tiers[tier][:k]]
@@ -9,10 +9,35 @@ Features:
 - Slippage protection
 - MEV resistance
 - Multi-DEX routing
+- Batched multi-leg swaps in a single application call
 """
 
+import struct
+
 from pyteal import *
 
+from amm_math import DEFAULT_FEE_BPS, teal_min_output, teal_swap_output
+
+# Mock reserves (in real implementation, would fetch from DEX)
+ALGO_RESERVE = 1000000000000   # 1M ALGO in microAlgos
+TOKEN_RESERVE = 500000000000   # 500K tokens in micro-units
+
+# swap_batch legs: direction (1 byte), input amount (uint64), min output (uint64)
+BATCH_LEG_FORMAT = '>BQQ'
+BATCH_LEG_SIZE = struct.calcsize(BATCH_LEG_FORMAT)
+# ~9 legs fit one call's 700 opcode budget; larger batches pool budget from extra app calls in the group
+MAX_BATCH_LEGS = 16
+SELL_ALGO = 0   # ALGO in, token out
+BUY_ALGO = 1    # token in, ALGO out
+
+
+def encode_batch_legs(legs):
+    """Pack [(direction, input_amount, min_output)] into the swap_batch argument"""
+    if not 1 <= len(legs) <= MAX_BATCH_LEGS:
+        raise ValueError(f"A batch needs between 1 and {MAX_BATCH_LEGS} legs")
+    return b''.join(struct.pack(BATCH_LEG_FORMAT, *leg) for leg in legs)
+
+
 def swap_algo_contract():
     """
     Smart contract for ALGO token swaps with advanced features
@@ -28,25 +53,33 @@ def swap_algo_contract():
     user_volume_key = Bytes("user_volume")
     last_swap_key = Bytes("last_swap")
     
-    def validate_swap():
+    def validate_swap(min_args=3):
+        # The approval program only runs for application calls, so TypeEnum needs no check
         return And(
-            Txn.type_enum() == TxnType.ApplicationCall,
-            Txn.application_args.length() >= Int(3),
+            Txn.application_args.length() >= Int(min_args),
             App.optedIn(Txn.sender(), Txn.application_id()),
             Global.group_size() <= Int(10)  # Max group size for complex swaps
         )
     
     def calculate_swap_output(input_amount, input_reserve, output_reserve):
-        # AMM constant product formula: x * y = k
-        # Output = (input * output_reserve) / (input_reserve + input)
-        numerator = Mul(input_amount, output_reserve)
-        denominator = Add(input_reserve, input_amount)
-        return Div(numerator, denominator)
+        # AMM constant product formula: x * y = k, fee in basis points
+        # Shared with off-chain quotes via amm_math.swap_output_micro (same rounding)
+        return teal_swap_output(input_amount, input_reserve, output_reserve, DEFAULT_FEE_BPS)
     
     def apply_slippage_protection(expected_output, slippage_tolerance):
-        # Minimum output = expected_output * (1 - slippage_tolerance)
-        slippage_multiplier = Minus(Int(10000), slippage_tolerance)  # Basis points
-        return Div(Mul(expected_output, slippage_multiplier), Int(10000))
+        # Minimum output = expected_output * (1 - slippage_tolerance), in basis points
+        return teal_min_output(expected_output, slippage_tolerance)
+    
+    # Scratch slots for values reused within a branch
+    input_amount = ScratchVar(TealType.uint64)
+    expected_output = ScratchVar(TealType.uint64)
+    
+    # Scratch slots for the swap_batch loop
+    leg_count = ScratchVar(TealType.uint64)
+    leg = ScratchVar(TealType.uint64)
+    leg_offset = ScratchVar(TealType.uint64)
+    batch_volume = ScratchVar(TealType.uint64)
+    batch_legs = Txn.application_args[1]
     
     program = Cond(
         # Contract initialization
@@ -59,7 +92,7 @@ def swap_algo_contract():
          ])],
         
         # User opt-in
-        [Txn.on_completion() == OnCall.OptIn,
+        [Txn.on_completion() == OnComplete.OptIn,
          Seq([
              App.localPut(Txn.sender(), user_swaps_key, Int(0)),
              App.localPut(Txn.sender(), user_volume_key, Int(0)),
@@ -72,31 +105,22 @@ def swap_algo_contract():
          Seq([
              Assert(validate_swap()),
              
-             # Extract swap parameters
-             input_amount := Btoi(Txn.application_args[1]),
-             token_id := Btoi(Txn.application_args[2]),
-             min_output := Btoi(Txn.application_args[3]),
-             
-             # Mock reserves (in real implementation, would fetch from DEX)
-             algo_reserve := Int(1000000000000),  # 1M ALGO
-             token_reserve := Int(500000000000),  # 500K tokens
+             # Extract swap parameters (args: amount, token id, min output)
+             input_amount.store(Btoi(Txn.application_args[1])),
              
              # Calculate expected output
-             expected_output := calculate_swap_output(
-                 input_amount, 
-                 algo_reserve, 
-                 token_reserve
-             ),
+             expected_output.store(calculate_swap_output(
+                 input_amount.load(),
+                 ALGO_RESERVE,
+                 TOKEN_RESERVE
+             )),
              
-             # Apply slippage protection
-             min_acceptable := apply_slippage_protection(
-                 expected_output,
+             # Validate minimum output and slippage protection
+             Assert(expected_output.load() >= Btoi(Txn.application_args[3])),
+             Assert(expected_output.load() >= apply_slippage_protection(
+                 expected_output.load(),
                  App.globalGet(slippage_tolerance_key)
-             ),
-             
-             # Validate minimum output
-             Assert(expected_output >= min_output),
-             Assert(expected_output >= min_acceptable),
+             )),
              
              # Update user stats
              App.localPut(
@@ -107,7 +131,7 @@ def swap_algo_contract():
              App.localPut(
                  Txn.sender(),
                  user_volume_key,
-                 App.localGet(Txn.sender(), user_volume_key) + input_amount
+                 App.localGet(Txn.sender(), user_volume_key) + input_amount.load()
              ),
              App.localPut(
                  Txn.sender(),
@@ -122,15 +146,15 @@ def swap_algo_contract():
              ),
              App.globalPut(
                  total_volume_key,
-                 App.globalGet(total_volume_key) + input_amount
+                 App.globalGet(total_volume_key) + input_amount.load()
              ),
              
              # Log swap details
              Log(Concat(
                  Bytes("Swap executed - Input: "),
-                 Itob(input_amount),
+                 Itob(input_amount.load()),
                  Bytes(" Output: "),
-                 Itob(expected_output)
+                 Itob(expected_output.load())
              )),
              
              Return(Int(1))
@@ -141,21 +165,18 @@ def swap_algo_contract():
          Seq([
              Assert(validate_swap()),
              
-             token_amount := Btoi(Txn.application_args[1]),
-             min_algo_output := Btoi(Txn.application_args[2]),
-             
-             # Calculate ALGO output
-             algo_output := calculate_swap_output(
-                 token_amount,
-                 Int(500000000000),  # Token reserve
-                 Int(1000000000000)  # ALGO reserve
-             ),
+             # Calculate ALGO output (args: token amount, min ALGO output)
+             expected_output.store(calculate_swap_output(
+                 Btoi(Txn.application_args[1]),
+                 TOKEN_RESERVE,
+                 ALGO_RESERVE
+             )),
              
-             Assert(algo_output >= min_algo_output),
+             Assert(expected_output.load() >= Btoi(Txn.application_args[2])),
              
              Log(Concat(
                  Bytes("ALGO purchased - Amount: "),
-                 Itob(algo_output)
+                 Itob(expected_output.load())
              )),
              
              Return(Int(1))
@@ -166,21 +187,18 @@ def swap_algo_contract():
          Seq([
              Assert(validate_swap()),
              
-             algo_amount := Btoi(Txn.application_args[1]),
-             min_token_output := Btoi(Txn.application_args[2]),
-             
-             # Calculate token output
-             token_output := calculate_swap_output(
-                 algo_amount,
-                 Int(1000000000000),  # ALGO reserve
-                 Int(500000000000)    # Token reserve
-             ),
+             # Calculate token output (args: ALGO amount, min token output)
+             expected_output.store(calculate_swap_output(
+                 Btoi(Txn.application_args[1]),
+                 ALGO_RESERVE,
+                 TOKEN_RESERVE
+             )),
              
-             Assert(token_output >= min_token_output),
+             Assert(expected_output.load() >= Btoi(Txn.application_args[2])),
              
              Log(Concat(
                  Bytes("ALGO sold - Tokens received: "),
-                 Itob(token_output)
+                 Itob(expected_output.load())
              )),
              
              Return(Int(1))
@@ -210,8 +228,85 @@ def swap_algo_contract():
              Return(Int(1))
          ])],
         
+        # Batched swap: several legs in one call, stats written once at the end.
+        # Dispatched after the existing methods so their selector checks don't grow
+        [Txn.application_args[0] == Bytes("swap_batch"),
+         Seq([
+             Assert(validate_swap(min_args=2)),
+             
+             # Decode the leg count (args: packed legs, see encode_batch_legs)
+             leg_count.store(Len(batch_legs) / Int(BATCH_LEG_SIZE)),
+             Assert(Len(batch_legs) % Int(BATCH_LEG_SIZE) == Int(0)),
+             Assert(leg_count.load() >= Int(1)),
+             Assert(leg_count.load() <= Int(MAX_BATCH_LEGS)),
+             
+             batch_volume.store(Int(0)),
+             For(
+                 leg.store(Int(0)),
+                 leg.load() < leg_count.load(),
+                 leg.store(leg.load() + Int(1))
+             ).Do(Seq([
+                 leg_offset.store(leg.load() * Int(BATCH_LEG_SIZE)),
+                 input_amount.store(ExtractUint64(batch_legs, leg_offset.load() + Int(1))),
+                 
+                 # Volume is tracked in ALGO for both directions
+                 If(GetByte(batch_legs, leg_offset.load()) == Int(SELL_ALGO))
+                 .Then(Seq([
+                     expected_output.store(calculate_swap_output(
+                         input_amount.load(), ALGO_RESERVE, TOKEN_RESERVE
+                     )),
+                     batch_volume.store(batch_volume.load() + input_amount.load())
+                 ]))
+                 .ElseIf(GetByte(batch_legs, leg_offset.load()) == Int(BUY_ALGO))
+                 .Then(Seq([
+                     expected_output.store(calculate_swap_output(
+                         input_amount.load(), TOKEN_RESERVE, ALGO_RESERVE
+                     )),
+                     batch_volume.store(batch_volume.load() + expected_output.load())
+                 ]))
+                 .Else(Err()),
+                 
+                 # Per-leg minimum output
+                 Assert(expected_output.load() >= ExtractUint64(batch_legs, leg_offset.load() + Int(9)))
+             ])),
+             
+             # Update user and global stats once for the whole batch
+             App.localPut(
+                 Txn.sender(),
+                 user_swaps_key,
+                 App.localGet(Txn.sender(), user_swaps_key) + leg_count.load()
+             ),
+             App.localPut(
+                 Txn.sender(),
+                 user_volume_key,
+                 App.localGet(Txn.sender(), user_volume_key) + batch_volume.load()
+             ),
+             App.localPut(
+                 Txn.sender(),
+                 last_swap_key,
+                 Global.latest_timestamp()
+             ),
+             App.globalPut(
+                 total_swaps_key,
+                 App.globalGet(total_swaps_key) + leg_count.load()
+             ),
+             App.globalPut(
+                 total_volume_key,
+                 App.globalGet(total_volume_key) + batch_volume.load()
+             ),
+             
+             Log(Concat(
+                 Bytes("Batch executed - Legs: "),
+                 Itob(leg_count.load()),
+                 Bytes(" ALGO volume: "),
+                 Itob(batch_volume.load())
+             )),
+             
+             Return(Int(1))
+         ])],
+        
         # Default case
-        [Return(Int(0))]
+        [Int(1), Return(Int(0))]
     )
     
     return program
@@ -229,6 +324,7 @@ if __name__ == "__main__":
     print("   - Slippage protection (1% default)")
     print("   - MEV resistance with group transaction limits")
     print("   - Multi-operation support (swap/buy/sell)")
+    print(f"   - Batched swaps (up to {MAX_BATCH_LEGS} legs per call)")
     print("   - Comprehensive user statistics")
     print("   - Real-time volume tracking")
     print("")
@@ -0,0 +1,414 @@
+"""
+TEAL Profile
+============
+Static opcode-cost and state-access profiler for the compiled Aether AI
+contracts. Shows where each "/swapAlgo", "/getBalance", ... call spends its
+opcode budget so grouped swaps stay inside the pooled application budget.
+
+Features:
+- Splits an approval program into its top-level Cond branches
+- Worst-case opcode cost per branch (dispatch checks + body), with If/Else
+  arms and subroutines followed and loops counted for one iteration
+- Per-iteration cost of every loop, to size batched calls
+- Repeated global/local state reads and repeated argument decoding on the
+  worst-case path
+- Per-branch budget table against the 700 opcode application call budget
+- Baseline check that fails when a branch gets more expensive
+
+Usage:
+    python teal_profile.py                       # all contracts (built via build_contracts)
+    python teal_profile.py swap_algo
+    python teal_profile.py --teal path/to/approval.teal --json
+    python teal_profile.py --check                # compare with opcode_baseline.json
+    python teal_profile.py --save-baseline        # accept the current costs
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+APP_CALL_BUDGET = 700
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opcode_baseline.json')
+
+# AVM v8 opcode costs that differ from 1 (data-dependent ops use their base cost)
+OPCODE_COSTS = {
+    'sha256': 35,
+    'keccak256': 130,
+    'sha512_256': 45,
+    'sha3_256': 130,
+    'ed25519verify': 1900,
+    'ed25519verify_bare': 1900,
+    'ecdsa_verify': 1700,
+    'ecdsa_pk_decompress': 650,
+    'ecdsa_pk_recover': 2000,
+    'vrf_verify': 5700,
+    'divmodw': 20,
+    'bsqrt': 40,
+    'b+': 10,
+    'b-': 10,
+    'b*': 20,
+    'b/': 20,
+    'b%': 20,
+    'b|': 6,
+    'b&': 6,
+    'b^': 6,
+    'b~': 4,
+    'json_ref': 25,
+    'base64_decode': 1
+}
+
+TERMINAL_OPS = {'return', 'err', 'retsub'}
+BRANCH_OPS = {'bnz', 'bz'}
+
+
+class Instruction:
+    """One TEAL line: opcode, immediate arguments and source line number"""
+
+    __slots__ = ('op', 'args', 'line')
+
+    def __init__(self, op, args, line):
+        self.op = op
+        self.args = args
+        self.line = line
+
+    @property
+    def cost(self):
+        return OPCODE_COSTS.get(self.op, 1)
+
+    def __repr__(self):
+        return ' '.join((self.op,) + self.args)
+
+
+def _split_args(rest):
+    """Split immediates, keeping quoted byte strings intact"""
+    args, current, quoted = [], '', False
+    for char in rest:
+        if char == '"':
+            quoted = not quoted
+            current += char
+        elif char.isspace() and not quoted:
+            if current:
+                args.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        args.append(current)
+    return tuple(args)
+
+
+def parse_teal(text):
+    """Return (instructions, labels) with labels mapping name -> instruction index"""
+    instructions, labels = [], {}
+    for line_number, raw in enumerate(text.splitlines(), 1):
+        line = raw.split('//', 1)[0].strip()
+        if not line or line.startswith('#pragma'):
+            continue
+        if line.endswith(':') and ' ' not in line:
+            labels[line[:-1]] = len(instructions)
+            continue
+        op, _, rest = line.partition(' ')
+        instructions.append(Instruction(op, _split_args(rest), line_number))
+    return instructions, labels
+
+
+class TealProfiler:
+    """Worst-case cost and state access analysis of one compiled program"""
+
+    def __init__(self, text):
+        self.instructions, self.labels = parse_teal(text)
+        self._path_memo = {}
+        self._active = set()        # instructions on the current search path
+        self._back_edges = {}       # back edge instruction -> loop header
+
+    def _successors(self, index):
+        instruction = self.instructions[index]
+        if instruction.op in TERMINAL_OPS:
+            return []
+        if instruction.op == 'b':
+            return [self.labels[instruction.args[0]]]
+        if instruction.op in BRANCH_OPS:
+            return [index + 1, self.labels[instruction.args[0]]]
+        if instruction.op in ('switch', 'match'):
+            return [index + 1] + [self.labels[label] for label in instruction.args]
+        return [index + 1] if index + 1 < len(self.instructions) else []
+
+    def _loop_exit(self, header):
+        """Where a loop goes when its condition fails (PyTeal: bnz <body> falls through, bz <end> jumps)"""
+        for index in range(header, len(self.instructions)):
+            instruction = self.instructions[index]
+            if instruction.op == 'bnz':
+                return index + 1
+            if instruction.op == 'bz':
+                return self.labels[instruction.args[0]]
+        raise ValueError(f"Cannot find the exit of the loop at line {self.instructions[header].line}")
+
+    def loops(self, path):
+        """(source line, per-iteration cost) of each loop entered along a path"""
+        found = []
+        for index in path:
+            header = self._back_edges.get(index)
+            if header is not None:
+                # Header to exit covers condition + body + back jump, plus the exit path
+                iteration = self.worst_path(header)[0] - self.worst_path(self._loop_exit(header))[0]
+                found.append((self.instructions[header].line, iteration))
+        return found
+
+    def worst_path(self, start):
+        """(cost, [instruction index]) of the most expensive path from start to a terminal op"""
+        if start in self._path_memo:
+            return self._path_memo[start]
+        # Depth-first search on an explicit stack: a frame per instruction on the
+        # current path would hit the recursion limit on long straight-line programs
+        stack = [self._search(start)]
+        result = None
+        while stack:
+            try:
+                successor = stack[-1].send(result)
+            except StopIteration as done:
+                stack.pop()
+                result = done.value
+                continue
+            result = self._path_memo.get(successor)
+            if result is None:
+                stack.append(self._search(successor))
+        return result
+
+    def _search(self, start):
+        """
+        Search step for worst_path: yields each successor it needs and is sent
+        that successor's (cost, path); returns its own (cost, path).
+        """
+        self._active.add(start)
+
+        instruction = self.instructions[start]
+        cost = instruction.cost
+        if instruction.op == 'callsub':
+            sub_cost, sub_path = yield self.labels[instruction.args[0]]
+            rest_cost, rest_path = (yield start + 1) if start + 1 < len(self.instructions) else (0, [])
+            result = (cost + sub_cost + rest_cost, [start] + sub_path + rest_path)
+        else:
+            best_cost, best_path = 0, []
+            for successor in self._successors(start):
+                if successor in self._active:
+                    # Back edge: count one iteration, then leave through the loop exit
+                    self._back_edges[start] = successor
+                    successor = self._loop_exit(successor)
+                successor_cost, successor_path = yield successor
+                if successor_cost > best_cost:
+                    best_cost, best_path = successor_cost, successor_path
+            result = (cost + best_cost, [start] + best_path)
+
+        self._active.discard(start)
+        self._path_memo[start] = result
+        return result
+
+    def branches(self):
+        """
+        Top-level Cond branches as (name, dispatch indexes, body start).
+
+        PyTeal compiles Cond into a run of "<condition>; bnz <label>" checks
+        ending in err; each branch pays for every check up to and including its own.
+        """
+        dispatch_end = next(
+            (i for i, instruction in enumerate(self.instructions) if instruction.op in TERMINAL_OPS),
+            len(self.instructions) - 1
+        )
+        if self.instructions[dispatch_end].op != 'err':
+            return [('program', [], 0)]
+
+        branches, checked, condition_start = [], [], 0
+        for index in range(dispatch_end):
+            instruction = self.instructions[index]
+            if instruction.op != 'bnz':
+                continue
+            condition = self.instructions[condition_start:index]
+            checked.extend(range(condition_start, index + 1))
+            branches.append((
+                self._branch_name(condition),
+                list(checked),
+                self.labels[instruction.args[0]]
+            ))
+            condition_start = index + 1
+        return branches or [('program', [], 0)]
+
+    @staticmethod
+    def _branch_name(condition):
+        ops = [repr(instruction) for instruction in condition]
+        if ops == ['txn ApplicationID', 'int 0', '==']:
+            return 'create'
+        if len(ops) == 3 and ops[0] == 'txn OnCompletion' and ops[2] == '==':
+            return ops[1].split(' ', 1)[1].lower()
+        if len(ops) == 3 and ops[0] == 'txna ApplicationArgs 0' and ops[1].startswith('byte "'):
+            return ops[1][len('byte "'):-1]
+        if ops == ['int 1']:
+            return 'default'
+        return ' '.join(ops)
+
+    def _access_report(self, path):
+        """State reads, writes and argument decodes along a path"""
+        global_reads, local_reads, arg_decodes = Counter(), Counter(), Counter()
+        writes = 0
+        for position, index in enumerate(path):
+            instruction = self.instructions[index]
+            previous = self.instructions[path[position - 1]] if position else None
+            if instruction.op in ('app_global_get', 'app_local_get') and previous is not None \
+                    and previous.op == 'byte':
+                key = previous.args[0].strip('"')
+                (global_reads if instruction.op == 'app_global_get' else local_reads)[key] += 1
+            elif instruction.op in ('app_global_put', 'app_local_put', 'app_global_del', 'app_local_del'):
+                writes += 1
+            elif instruction.op == 'btoi' and previous is not None and previous.op == 'txna' \
+                    and previous.args[0] == 'ApplicationArgs':
+                arg_decodes[int(previous.args[1])] += 1
+        return global_reads, local_reads, arg_decodes, writes
+
+    def profile(self):
+        """Per-branch cost and access report, in dispatch order"""
+        report = []
+        for name, dispatch, body_start in self.branches():
+            dispatch_cost = sum(self.instructions[i].cost for i in dispatch)
+            body_cost, body_path = self.worst_path(body_start)
+            global_reads, local_reads, arg_decodes, writes = self._access_report(body_path)
+            total = dispatch_cost + body_cost
+            report.append({
+                'branch': name,
+                'dispatch_cost': dispatch_cost,
+                'body_cost': body_cost,
+                'total_cost': total,
+                'budget_used': total / APP_CALL_BUDGET,
+                'opcodes': len(dispatch) + len(body_path),
+                'state_reads': sum(global_reads.values()) + sum(local_reads.values()),
+                'state_writes': writes,
+                'repeated_global_reads': {key: n for key, n in global_reads.items() if n > 1},
+                'repeated_local_reads': {key: n for key, n in local_reads.items() if n > 1},
+                'repeated_arg_decodes': {index: n for index, n in arg_decodes.items() if n > 1},
+                'loop_iteration_costs': [cost for _, cost in self.loops(body_path)]
+            })
+        return report
+
+
+def profile_teal(text):
+    """Profile compiled TEAL source text"""
+    return TealProfiler(text).profile()
+
+
+def profile_contracts(names=None):
+    """Build (using the cache) and profile the approval program of each contract"""
+    from build_contracts import BUILD_DIR, build_contracts
+
+    profiles = {}
+    for name, status in build_contracts(names).items():
+        if status.startswith('error'):
+            raise RuntimeError(f"{name}: {status}")
+        with open(os.path.join(BUILD_DIR, f"{name}_approval.teal")) as f:
+            profiles[name] = profile_teal(f.read())
+    return profiles
+
+
+def format_profile(name, profile):
+    """Budget table for one program"""
+    lines = [
+        f"📊 {name}",
+        f"   {'Branch':<16}{'Dispatch':>9}{'Body':>7}{'Total':>7}{'Budget':>8}{'Reads':>7}{'Writes':>7}  Repeats"
+    ]
+    for branch in profile:
+        repeats = [f"global {key} x{n}" for key, n in branch['repeated_global_reads'].items()]
+        repeats += [f"local {key} x{n}" for key, n in branch['repeated_local_reads'].items()]
+        repeats += [f"btoi(arg {index}) x{n}" for index, n in branch['repeated_arg_decodes'].items()]
+        repeats += [f"+{cost}/loop iteration" for cost in branch['loop_iteration_costs']]
+        lines.append(
+            f"   {branch['branch']:<16}{branch['dispatch_cost']:>9}{branch['body_cost']:>7}"
+            f"{branch['total_cost']:>7}{branch['budget_used']:>8.1%}{branch['state_reads']:>7}"
+            f"{branch['state_writes']:>7}  {', '.join(repeats) or '-'}"
+        )
+    return '\n'.join(lines)
+
+
+def branch_costs(profiles):
+    """{contract: {branch: total_cost}} as stored in the baseline file"""
+    return {
+        name: {branch['branch']: branch['total_cost'] for branch in profile}
+        for name, profile in profiles.items()
+    }
+
+
+def compare_baseline(profiles, baseline):
+    """
+    Per-branch (contract, branch, baseline cost, current cost) rows and
+    whether any branch regressed. Branches missing from the baseline are
+    reported with a baseline of None and never count as regressions.
+    """
+    rows, regressed = [], False
+    for name, costs in branch_costs(profiles).items():
+        for branch, cost in costs.items():
+            before = baseline.get(name, {}).get(branch)
+            if before is not None and cost > before:
+                regressed = True
+            rows.append((name, branch, before, cost))
+    return rows, regressed
+
+
+def format_comparison(rows):
+    """Cost table of baseline versus current"""
+    lines = [f"   {'Contract':<14}{'Branch':<16}{'Baseline':>9}{'Current':>9}{'Change':>9}"]
+    for name, branch, before, cost in rows:
+        change = '-' if before is None else f"{cost - before:+d}"
+        before = '-' if before is None else before
+        lines.append(f"   {name:<14}{branch:<16}{before:>9}{cost:>9}{change:>9}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static opcode-cost and state-access profile of TEAL programs")
+    parser.add_argument('contracts', nargs='*', help="contract module names (default: all)")
+    parser.add_argument('--teal', action='append', default=[], help="profile a compiled .teal file instead")
+    parser.add_argument('--json', action='store_true', help="print the profile as JSON")
+    parser.add_argument('--check', nargs='?', const=BASELINE_PATH, metavar='BASELINE',
+                        help="fail if any branch costs more than in the baseline file")
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE_PATH, metavar='BASELINE',
+                        help="write the current per-branch costs as the new baseline")
+    args = parser.parse_args()
+
+    if args.teal:
+        profiles = {}
+        for path in args.teal:
+            with open(path) as f:
+                profiles[os.path.basename(path)] = profile_teal(f.read())
+    else:
+        profiles = profile_contracts(args.contracts or None)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(branch_costs(profiles), f, indent=2)
+            f.write('\n')
+        print(f"💾 Baseline written to {args.save_baseline}")
+        return
+
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        rows, regressed = compare_baseline(profiles, baseline)
+        print("📉 Opcode cost versus baseline:")
+        print(format_comparison(rows))
+        if regressed:
+            print("❌ Some branches got more expensive")
+            sys.exit(1)
+        print("✅ No branch exceeds its baseline cost")
+        return
+
+    if args.json:
+        json.dump(profiles, sys.stdout, indent=2)
+        print()
+        return
+
+    for name, profile in profiles.items():
+        print(format_profile(name, profile))
+        print()
+    print(f"Budget: {APP_CALL_BUDGET} opcodes per application call (pooled across a group)")
+
+
+if __name__ == "__main__":
+    main()
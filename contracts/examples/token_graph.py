@@ -0,0 +1,164 @@
+"""
+Token Graph
+===========
+Adjacency-list view of DEX liquidity pools used for multi-hop route search.
+Used by the Aether AI "/openDEX" router to find direct and indirect swap paths.
+
+Features:
+- Graph built once from pool listings (adjacency lists keyed by asset)
+- Bounded-hop k-best path search on -log(rate) edge weights
+- Pair index for O(1) final-hop lookups
+"""
+
+import heapq
+import math
+from collections import defaultdict
+
+from amm_math import spot_rate
+
+
+class PoolEdge:
+    """Directed swap edge through a single liquidity pool"""
+
+    __slots__ = (
+        'pool_key', 'venue', 'token_in', 'token_out', 'fee',
+        'reserve_in', 'reserve_out', 'rate', 'weight'
+    )
+
+    def __init__(self, pool_key, venue, token_in, token_out, fee, rate):
+        self.pool_key = pool_key
+        self.venue = venue
+        self.token_in = token_in
+        self.token_out = token_out
+        self.fee = fee
+        self.reserve_in = None
+        self.reserve_out = None
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Update the marginal exchange rate and its -log weight"""
+        self.rate = rate
+        self.weight = -math.log(rate) if rate > 0 else math.inf
+
+
+class TokenGraph:
+    """Swap graph keyed by asset symbol with one edge per pool direction"""
+
+    def __init__(self):
+        self.adjacency = defaultdict(list)      # token -> [PoolEdge]
+        self.predecessors = defaultdict(set)    # token -> {tokens with an edge into it}
+        self.pair_edges = defaultdict(list)     # (token_in, token_out) -> [PoolEdge]
+        self.pool_edges = {}                    # (venue, pool_key) -> (edge_ab, edge_ba)
+        self.pool_count = 0
+
+    @classmethod
+    def from_registry(cls, registry, venues=None):
+        """Build the graph once from the pools in a PoolRegistry"""
+        graph = cls()
+        for pool in registry.records():
+            if venues is not None and pool.venue not in venues:
+                continue
+            graph.add_pool(
+                pool.pool_id, pool.venue, pool.asset_1, pool.asset_2,
+                pool.fee, pool.reserve_1, pool.reserve_2
+            )
+        return graph
+
+    def add_pool(self, pool_key, venue, asset_a, asset_b, fee, reserve_a=None, reserve_b=None):
+        """Register both swap directions of a pool"""
+        edges = (
+            PoolEdge(pool_key, venue, asset_a, asset_b, fee, 1 - fee),
+            PoolEdge(pool_key, venue, asset_b, asset_a, fee, 1 - fee)
+        )
+        for edge in edges:
+            self.adjacency[edge.token_in].append(edge)
+            self.predecessors[edge.token_out].add(edge.token_in)
+            self.pair_edges[(edge.token_in, edge.token_out)].append(edge)
+        self.pool_edges[(venue, pool_key)] = edges
+        self.pool_count += 1
+
+        # Without reserves the pool is priced 1:1 and only the fee discounts the rate
+        if reserve_a and reserve_b:
+            self.update_reserves(venue, pool_key, reserve_a, reserve_b)
+
+    def update_reserves(self, venue, pool_key, reserve_a, reserve_b, fee=None):
+        """Reprice both directions of a pool from its current reserves"""
+        edge_ab, edge_ba = self.pool_edges[(venue, pool_key)]
+        if fee is not None:
+            edge_ab.fee = edge_ba.fee = fee
+        edge_ab.reserve_in, edge_ab.reserve_out = reserve_a, reserve_b
+        edge_ba.reserve_in, edge_ba.reserve_out = reserve_b, reserve_a
+        edge_ab.set_rate(spot_rate(reserve_a, reserve_b, edge_ab.fee))
+        edge_ba.set_rate(spot_rate(reserve_b, reserve_a, edge_ba.fee))
+
+    def edges_between(self, token_in, token_out):
+        """All pool edges swapping token_in directly into token_out"""
+        return self.pair_edges.get((token_in, token_out), ())
+
+    def k_best_paths(self, token_in, token_out, k=3, max_hops=3):
+        """
+        Find up to k lowest-cost simple paths from token_in to token_out.
+
+        Runs a hop-bounded Bellman-Ford relaxation over -log(rate) weights,
+        keeping the k best partial paths per token at every layer. Returns a
+        list of (cost, edges) tuples sorted by cost, where exp(-cost) is the
+        compounded marginal rate of the path.
+        """
+        if token_in == token_out or token_in not in self.adjacency:
+            return []
+
+        results = []
+        tie = 0
+        frontier = {token_in: [(0.0, ())]}
+
+        for hop in range(1, max_hops + 1):
+            # Close paths that can reach the target in one more swap
+            for node, paths in frontier.items():
+                for edge in self.pair_edges.get((node, token_out), ()):
+                    for cost, path in paths:
+                        tie += 1
+                        results.append((cost + edge.weight, tie, path + (edge,)))
+
+            if hop == max_hops:
+                break
+
+            # Only tokens that can still reach the target are worth expanding
+            last_layer = hop + 1 == max_hops
+            targets = self.predecessors.get(token_out, ())
+            next_frontier = {}
+            for node, paths in frontier.items():
+                if last_layer and len(targets) < len(self.adjacency[node]):
+                    candidates = [
+                        edge
+                        for nxt in targets
+                        for edge in self.pair_edges.get((node, nxt), ())
+                    ]
+                else:
+                    candidates = self.adjacency[node]
+
+                for edge in candidates:
+                    nxt = edge.token_out
+                    if nxt == token_out or nxt == token_in:
+                        continue
+                    if last_layer and nxt not in targets:
+                        continue
+                    bucket = next_frontier.setdefault(nxt, [])
+                    for cost, path in paths:
+                        if any(e.token_in == nxt for e in path):
+                            continue  # keep paths simple
+                        tie += 1
+                        entry = (-(cost + edge.weight), tie, path + (edge,))
+                        if len(bucket) < k:
+                            heapq.heappush(bucket, entry)
+                        elif entry > bucket[0]:
+                            heapq.heapreplace(bucket, entry)
+
+            frontier = {
+                node: [(-neg_cost, path) for neg_cost, _, path in bucket]
+                for node, bucket in next_frontier.items()
+                if bucket
+            }
+            if not frontier:
+                break
+
+        return [(cost, list(path)) for cost, _, path in heapq.nsmallest(k, results)]
@@ -1,36 +1,146 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
+import hashlib
+import json
+import logging
 import os
 from datetime import datetime
 
-app = Flask(__name__)
+import msgpack
 
-@app.route('/')
-def home():
-    return jsonify({
+from quote_engine import QuoteEngine
+
+SERVICE_VERSION = '1.0.0'
+DEFAULT_MODELS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models.json')
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """JSON body serialized once, served with a strong ETag"""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+    def to_response(self):
+        # Pollers that send If-None-Match get an empty 304 instead of the body
+        if request.if_none_match.contains(self.etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.body, mimetype='application/json')
+        response.set_etag(self.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+def load_model_registry(path):
+    """Read the model list served by /api/models"""
+    with open(path) as f:
+        return json.load(f)['models']
+
+
+def load_quote_engine():
+    """Build the in-process quote engine, or None if the quoting code is unavailable"""
+    contracts_path = os.environ.get('CONTRACTS_PATH')
+    try:
+        return QuoteEngine(contracts_path, os.environ.get('POOL_SNAPSHOT'))
+    except ImportError as e:
+        logger.warning("Quote engine disabled: %s", e)
+        return None
+    except (OSError, ValueError) as e:
+        # A missing, unreadable or corrupt snapshot (SnapshotError) shouldn't take the service down
+        logger.warning("Pool snapshot not loaded, using built-in pools: %s", e)
+        return QuoteEngine(contracts_path)
+
+
+def create_app():
+    """Application factory used by both the dev server and gunicorn"""
+    app = Flask(__name__)
+
+    # Everything the status endpoints return is fixed for the life of the process
+    models = load_model_registry(os.environ.get('MODELS_FILE', DEFAULT_MODELS_FILE))
+    started_at = datetime.utcnow().isoformat()
+    home_response = CachedResponse({
         'service': 'LocalAI',
         'status': 'running',
-        'version': '1.0.0',
-        'timestamp': datetime.utcnow().isoformat()
+        'version': SERVICE_VERSION,
+        'started_at': started_at
     })
+    health_response = CachedResponse({'status': 'healthy'})
+    models_response = CachedResponse({'models': models})
+    quote_engine = load_quote_engine()
+    max_batch_size = int(os.environ.get('MAX_QUOTE_BATCH', 1000))
+    reserve_stream = os.environ.get('RESERVE_STREAM')
 
-@app.route('/health')
-def health():
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat()
-    })
+    if quote_engine is not None and reserve_stream:
+        @app.before_request
+        def follow_reserve_stream():
+            # Started lazily so each forked worker gets its own reader thread
+            quote_engine.start_reserve_stream(
+                reserve_stream, float(os.environ.get('RESERVE_STREAM_WINDOW', 0.25))
+            )
+
+    @app.route('/')
+    def home():
+        return home_response.to_response()
+
+    @app.route('/health')
+    def health():
+        # Liveness: the process is up and serving; no dependency checks
+        return health_response.to_response()
+
+    @app.route('/ready')
+    def ready():
+        # Readiness: the dependencies needed to serve real traffic are loaded
+        checks = {
+            'models_loaded': bool(models),
+            'quote_engine_loaded': quote_engine is not None
+        }
+        ok = all(checks.values())
+        return jsonify({
+            'status': 'ready' if ok else 'not_ready',
+            'checks': checks,
+            'started_at': started_at
+        }), 200 if ok else 503
+
+    @app.route('/api/models')
+    def list_models():
+        return models_response.to_response()
+
+    @app.route('/api/quote/batch', methods=['POST'])
+    def quote_batch():
+        # Bodies may be JSON or msgpack; the reply uses the same encoding
+        use_msgpack = request.mimetype == MSGPACK_MIMETYPE
+        if use_msgpack:
+            try:
+                payload = msgpack.unpackb(request.get_data(), raw=False)
+            except (msgpack.UnpackException, ValueError):
+                # Undecodable bodies are treated like invalid JSON: a 400 below
+                payload = None
+        else:
+            payload = request.get_json(silent=True)
+
+        if quote_engine is None:
+            return jsonify({'error': 'Quote engine unavailable'}), 503
+        if not isinstance(payload, dict) or not isinstance(payload.get('quotes'), list):
+            return jsonify({'error': 'Body must be an object with a "quotes" list'}), 400
+        if len(payload['quotes']) > max_batch_size:
+            return jsonify({'error': f'Batch exceeds {max_batch_size} quotes'}), 413
+
+        result = {
+            'results': quote_engine.quote_batch(payload['quotes']),
+            'pool_state_version': quote_engine.registry.version
+        }
+        if use_msgpack:
+            return Response(msgpack.packb(result, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+        return jsonify(result)
+
+    return app
 
-@app.route('/api/models')
-def models():
-    # Placeholder for AI model endpoints
-    return jsonify({
-        'models': [
-            {'name': 'gpt-3.5-turbo', 'status': 'available'},
-            {'name': 'claude-3-sonnet', 'status': 'available'}
-        ]
-    })
 
 if __name__ == '__main__':
+    # Development server only; production runs gunicorn with gunicorn.conf.py
     port = int(os.environ.get('PORT', 8080))
     debug = os.environ.get('DEBUG', 'false').lower() == 'true'
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    create_app().run(host='0.0.0.0', port=port, debug=debug, threaded=True)
@@ -0,0 +1,33 @@
+# Production server settings for the LocalAI service.
+# Start with: gunicorn -c gunicorn.conf.py "app:create_app()"
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+
+# Worker processes, each serving requests on a thread pool
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Keep idle client connections open between polling requests
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Kill stuck workers, and give in-flight requests time to finish on SIGTERM
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 20))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Reload on code changes in development (DEBUG=true, as in docker-compose)
+reload = os.environ.get('DEBUG', 'false').lower() == 'true'
+
+# Load the app once in the master so workers share read-only state
+preload_app = not reload and os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
@@ -0,0 +1,159 @@
+"""
+Batch quote engine for the LocalAI service.
+
+Wraps the off-chain quoting code from contracts/examples (pool registry,
+Tinyman connector and DEX router) so many swap and route quotes can be
+answered from one request against a single in-process pool registry.
+"""
+import math
+import os
+import sys
+import threading
+
+MAX_ROUTE_HOPS = 4  # route search cost grows with the hop count
+SWAP_FIELDS = ('expected_output', 'fee_amount', 'price_impact', 'minimum_received')
+
+DEFAULT_CONTRACTS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'contracts', 'examples'
+)
+
+
+class QuoteRequestError(ValueError):
+    """A single quote request in a batch is malformed"""
+
+
+def _parse_amount(quote):
+    """Positive, finite input amount of a quote request"""
+    try:
+        amount = float(quote['amount'])
+    except OverflowError:
+        # JSON integers are unbounded; 10**400 doesn't fit a float
+        raise QuoteRequestError('amount is too large') from None
+    # NaN and inf pass a plain `<= 0` check and would reach the response as invalid JSON
+    if not (math.isfinite(amount) and amount > 0):
+        raise QuoteRequestError('amount must be a positive, finite number')
+    return amount
+
+
+class QuoteEngine:
+    """Evaluates batches of swap and route quotes against one pool registry"""
+
+    def __init__(self, contracts_path=None, snapshot_path=None):
+        contracts_path = os.path.abspath(contracts_path or DEFAULT_CONTRACTS_PATH)
+        if contracts_path not in sys.path:
+            sys.path.insert(0, contracts_path)
+
+        from connect_tinyman import connect_tinyman_contract
+        from open_dex import open_dex_contract
+        from pool_registry import default_registry
+        from pool_snapshot import load_snapshot
+
+        # Workers map a pool snapshot when one is configured instead of rebuilding pool state
+        self.registry = load_snapshot(snapshot_path) if snapshot_path else default_registry()
+        self.tinyman = connect_tinyman_contract(self.registry)
+        self.router = open_dex_contract(self.registry)
+        self._stream_pid = None
+        self._stream_lock = threading.Lock()
+
+    def start_reserve_stream(self, source, window=0.25):
+        """
+        Keep this process's registry in sync with a reserve event stream.
+
+        Runs the reserve_stream pipeline on a daemon thread. Threads don't
+        survive a fork, so this is safe to call on every request: it starts
+        at most one stream per process (gunicorn preloads the app in the
+        master, then each worker starts its own reader).
+        """
+        if self._stream_pid == os.getpid():
+            return
+        with self._stream_lock:
+            if self._stream_pid == os.getpid():
+                return
+            from reserve_stream import ReserveUpdatePipeline, open_source
+
+            pipeline = ReserveUpdatePipeline(self.registry, window=window)
+            thread = threading.Thread(
+                target=lambda: pipeline.run(open_source(source)), name='reserve-stream', daemon=True
+            )
+            thread.start()
+            self.reserve_stream = pipeline
+            self._stream_pid = os.getpid()
+
+    def quote_batch(self, quotes):
+        """Return one result per request, in order; bad requests get an 'error' entry"""
+        # Hold the registry lock so a streamed reserve update can't land mid-batch
+        with self.registry.lock:
+            return self._quote_batch(quotes)
+
+    def _quote_batch(self, quotes):
+        results = [None] * len(quotes)
+        swap_slots, pool_ids, directions, amounts = [], [], [], []
+
+        for i, quote in enumerate(quotes):
+            try:
+                kind = quote.get('type', 'swap')
+                if kind == 'swap':
+                    pool_id, direction, amount = self._parse_swap(quote)
+                    swap_slots.append(i)
+                    pool_ids.append(pool_id)
+                    directions.append(direction)
+                    amounts.append(amount)
+                elif kind == 'route':
+                    results[i] = self._quote_route(quote)
+                else:
+                    raise QuoteRequestError(f"Unknown quote type: {kind}")
+            except KeyError as e:
+                results[i] = {'error': f"Missing field: {e.args[0]}"}
+            except (QuoteRequestError, TypeError, ValueError, AttributeError, OverflowError) as e:
+                results[i] = {'error': str(e)}
+
+        # All swap quotes are priced in one vectorized pass
+        if swap_slots:
+            batch = self.tinyman.calculate_swap_outputs(pool_ids, directions, amounts)
+            for n, i in enumerate(swap_slots):
+                if not all(math.isfinite(batch[field][n]) for field in SWAP_FIELDS):
+                    # Overflow in the vectorized pass; NaN/Infinity aren't valid JSON
+                    results[i] = {'error': 'amount is too large to quote'}
+                    continue
+                results[i] = {
+                    'type': 'swap',
+                    'pool_id': pool_ids[n],
+                    'input_amount': amounts[n],
+                    'expected_output': float(batch['expected_output'][n]),
+                    'fee_amount': float(batch['fee_amount'][n]),
+                    'price_impact': float(batch['price_impact'][n]),
+                    'minimum_received': float(batch['minimum_received'][n])
+                }
+
+        return results
+
+    def _parse_swap(self, quote):
+        """Validate a swap request and resolve its pool direction"""
+        pool = self.registry.pool(quote['pool_id'])
+        if pool is None:
+            raise QuoteRequestError(f"Unknown pool: {quote['pool_id']}")
+        amount = _parse_amount(quote)
+
+        input_asset = quote['input_asset']
+        if input_asset in (pool.asset_1, pool.asset_1_id):
+            direction, reserve_in = 0, pool.reserve_1
+        elif input_asset in (pool.asset_2, pool.asset_2_id):
+            direction, reserve_in = 1, pool.reserve_2
+        else:
+            raise QuoteRequestError(f"{input_asset} is not traded in pool {pool.pool_id}")
+        if amount > reserve_in:
+            raise QuoteRequestError(f"amount exceeds the {input_asset} reserve of pool {pool.pool_id}")
+        return pool.pool_id, direction, amount
+
+    def _quote_route(self, quote):
+        """Best multi-hop route for a token pair"""
+        amount = _parse_amount(quote)
+        max_hops = int(quote.get('max_hops', 3))
+        if not 1 <= max_hops <= MAX_ROUTE_HOPS:
+            raise QuoteRequestError(f'max_hops must be between 1 and {MAX_ROUTE_HOPS}')
+        route = self.router.find_best_route(quote['token_in'], quote['token_out'], amount, max_hops)
+        if route is None:
+            raise QuoteRequestError(f"No route from {quote['token_in']} to {quote['token_out']}")
+        if not math.isfinite(route['expected_output']):
+            raise QuoteRequestError('amount is too large to quote')
+        return dict(route, type='route')